@@ -27,7 +27,9 @@ from .diagnostics import (
     get_log_directory,
     max_logs,
     log_level,
+    log_flush_interval,
     cleanup_logs,
+    refresh_project_root,
 )
 
 __version__ = "0.1.0"
@@ -47,5 +49,7 @@ __all__ = [
     "get_log_directory",
     "max_logs",
     "log_level",
+    "log_flush_interval",
     "cleanup_logs",
+    "refresh_project_root",
 ] 
\ No newline at end of file
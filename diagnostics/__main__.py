@@ -8,108 +8,137 @@ Run with: python -m diagnostics [command] [options]
 import argparse
 import json
 import sys
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from . import Metrics
-from .network import (
-    NetworkMetrics,
-    ConnectionMonitor,
-    LatencyMonitor,
-    DNSMonitor,
-    SSLCertMonitor,
-)
 
 
-def create_parser() -> argparse.ArgumentParser:
-    """Create the argument parser for the CLI."""
+COMMANDS = ("metrics", "network")
+NETWORK_COMMANDS = ("metrics", "connections", "latency", "dns", "ssl")
+
+
+def _sniff_subcommand(argv: List[str], choices: Sequence[str]) -> Optional[str]:
+    """Return the subcommand named in argv, if it can be determined cheaply.
+
+    Only the first positional token is considered. None is returned when help
+    was requested or the token is not a known command, so that the caller
+    builds the complete parser for help and error output.
+    """
+    if "-h" in argv or "--help" in argv:
+        return None
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg if arg in choices else None
+    return None
+
+
+def create_parser(
+    which: Optional[str] = None, network_which: Optional[str] = None
+) -> Tuple[argparse.ArgumentParser, Dict[str, argparse.ArgumentParser]]:
+    """Create the argument parser for the CLI.
+
+    Args:
+        which: Only build the subparser for this command (all if None)
+        network_which: Only build this network subcommand (all if None)
+
+    Returns:
+        The root parser and a dict of the top-level command parsers that were built
+    """
     parser = argparse.ArgumentParser(
         description="Diagnostics tool",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    command_parsers: Dict[str, argparse.ArgumentParser] = {}
 
-    # System metrics command
-    metrics_parser = subparsers.add_parser(
-        "metrics", help="Show system metrics"
-    )
-    metrics_parser.add_argument(
+    # Options shared by every leaf command
+    json_parent = argparse.ArgumentParser(add_help=False)
+    json_parent.add_argument(
         "--json", action="store_true", help="Output in JSON format"
     )
 
+    # System metrics command
+    if which in (None, "metrics"):
+        command_parsers["metrics"] = subparsers.add_parser(
+            "metrics", parents=[json_parent], help="Show system metrics"
+        )
+
+    if which not in (None, "network"):
+        return parser, command_parsers
+
     # Network subcommands
     network_parser = subparsers.add_parser(
         "network", help="Network diagnostics"
     )
+    command_parsers["network"] = network_parser
     network_subparsers = network_parser.add_subparsers(
         dest="network_command", help="Available network commands"
     )
 
     # Network metrics
-    network_metrics_parser = network_subparsers.add_parser(
-        "metrics", help="Show network interface metrics"
-    )
-    network_metrics_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
+    if network_which in (None, "metrics"):
+        network_subparsers.add_parser(
+            "metrics", parents=[json_parent], help="Show network interface metrics"
+        )
 
     # Network connections
-    network_conn_parser = network_subparsers.add_parser(
-        "connections", help="Show network connections"
-    )
-    network_conn_parser.add_argument(
-        "--status", help="Filter connections by status"
-    )
-    network_conn_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
+    if network_which in (None, "connections"):
+        network_conn_parser = network_subparsers.add_parser(
+            "connections", parents=[json_parent], help="Show network connections"
+        )
+        network_conn_parser.add_argument(
+            "--status", help="Filter connections by status"
+        )
 
     # Network latency
-    network_latency_parser = network_subparsers.add_parser(
-        "latency", help="Measure network latency"
-    )
-    network_latency_parser.add_argument("host", help="Host to measure latency to")
-    network_latency_parser.add_argument(
-        "--port", type=int, default=80, help="Port to connect to (default: 80)"
-    )
-    network_latency_parser.add_argument(
-        "--count", type=int, default=5, help="Number of measurements (default: 5)"
-    )
-    network_latency_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
+    if network_which in (None, "latency"):
+        network_latency_parser = network_subparsers.add_parser(
+            "latency", parents=[json_parent], help="Measure network latency"
+        )
+        network_latency_parser.add_argument("host", help="Host to measure latency to")
+        network_latency_parser.add_argument(
+            "--port", type=int, default=80, help="Port to connect to (default: 80)"
+        )
+        network_latency_parser.add_argument(
+            "--count", type=int, default=5, help="Number of measurements (default: 5)"
+        )
 
     # Network DNS
-    network_dns_parser = network_subparsers.add_parser(
-        "dns", help="DNS resolution and cache info"
-    )
-    network_dns_parser.add_argument("hostname", help="Hostname to resolve")
-    network_dns_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
+    if network_which in (None, "dns"):
+        network_dns_parser = network_subparsers.add_parser(
+            "dns", parents=[json_parent], help="DNS resolution and cache info"
+        )
+        network_dns_parser.add_argument("hostname", help="Hostname to resolve")
 
     # Network SSL
-    network_ssl_parser = network_subparsers.add_parser(
-        "ssl", help="SSL/TLS certificate information"
-    )
-    network_ssl_parser.add_argument("hostname", help="Host to check certificate for")
-    network_ssl_parser.add_argument(
-        "--port", type=int, default=443, help="Port to connect to (default: 443)"
-    )
-    network_ssl_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
+    if network_which in (None, "ssl"):
+        network_ssl_parser = network_subparsers.add_parser(
+            "ssl", parents=[json_parent], help="SSL/TLS certificate information"
+        )
+        network_ssl_parser.add_argument("hostname", help="Host to check certificate for")
+        network_ssl_parser.add_argument(
+            "--port", type=int, default=443, help="Port to connect to (default: 443)"
+        )
 
-    return parser
+    return parser, command_parsers
 
 
 def main() -> Optional[int]:
     """Main entry point for the diagnostics CLI."""
-    parser = create_parser()
+    argv = sys.argv[1:]
+    which = _sniff_subcommand(argv, COMMANDS)
+    network_which = None
+    if which == "network":
+        network_which = _sniff_subcommand(
+            argv[argv.index("network") + 1:], NETWORK_COMMANDS
+        )
+    parser, command_parsers = create_parser(which, network_which)
     try:
         args = parser.parse_args()
     except SystemExit as e:
         if e.code == 2:  # Invalid command
-            parser.print_help()
+            # The partial parser only knows the sniffed branch; list them all
+            create_parser()[0].print_help()
         return e.code
 
     if not args.command:
@@ -126,19 +155,17 @@ def main() -> Optional[int]:
                 "app uptime_friendly": Metrics.uptime_friendly(),
             }
             if args.json:
-                print(json.dumps(data, indent=2))
+                output = json.dumps(data, indent=2) + "\n"
             else:
-                print("\nSystem Metrics:")
-                for key, value in data.items():
-                    print(f"  {key}: {value}")
+                output = "\nSystem Metrics:\n" + "".join(
+                    f"  {key}: {value}\n" for key, value in data.items()
+                )
+            sys.stdout.write(output)
+            sys.stdout.flush()
 
         elif args.command == "network":
             if not args.network_command:
-                network_parser = next(
-                    subparser for subparser in parser._subparsers._actions
-                    if subparser.dest == "command"
-                ).choices["network"]
-                network_parser.print_help()
+                command_parsers["network"].print_help()
                 return 0
 
             # Import network module's main function
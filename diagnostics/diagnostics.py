@@ -22,15 +22,20 @@ Example usage:
     ...     pass
 """
 # Standard library imports
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
 import sys
+import threading
 import time
 import warnings
 from datetime import datetime, timedelta
-from functools import wraps
-from pathlib import Path
-from typing import Callable, Optional, List
+from functools import lru_cache, wraps
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional, List, Tuple
 
 # Third-party imports
 try:
@@ -41,62 +46,89 @@ except ImportError:
     warnings.warn("psutil not installed. System metrics collection will be disabled.")
 
 
-class Metrics:
-    @staticmethod
-    def memory_usage() -> float:
-        """Get current memory usage in MB. Requires psutil to be installed."""
-        if not PSUTIL_AVAILABLE:
-            raise RuntimeError("psutil is not installed. System metrics are unavailable.")
-        return psutil.Process().memory_info().rss / 1024 / 1024
-
-    @staticmethod 
-    def cpu_percent() -> float:
-        """Get current CPU usage percentage. Requires psutil to be installed."""
-        if not PSUTIL_AVAILABLE:
-            raise RuntimeError("psutil is not installed. System metrics are unavailable.")
-        return psutil.cpu_percent()
-
-    @staticmethod
-    def thread_count() -> int:
-        """Get current thread count. Requires psutil to be installed."""
-        if not PSUTIL_AVAILABLE:
-            raise RuntimeError("psutil is not installed. System metrics are unavailable.")
-        return len(psutil.Process().threads())
-        
-    @staticmethod
-    def uptime() -> float:
-        """Get process uptime in seconds. Requires psutil to be installed."""
-        if not PSUTIL_AVAILABLE:
-            raise RuntimeError("psutil is not installed. System metrics are unavailable.")
-        return time.time() - psutil.Process().create_time()
-
-    @staticmethod
-    def uptime_friendly() -> str:
-        """Get process uptime in a human-readable format. Requires psutil to be installed."""
-        if not PSUTIL_AVAILABLE:
-            raise RuntimeError("psutil is not installed. System metrics are unavailable.")
-        seconds = Metrics.uptime()
-        return str(timedelta(seconds=int(seconds)))
+def _process() -> "psutil.Process":
+    """Return a cached psutil.Process for the current process.
+
+    The handle is recreated if the pid changes (e.g. after a fork).
+    """
+    global _proc, _proc_create_time
+    if not PSUTIL_AVAILABLE:
+        raise RuntimeError("psutil is not installed. System metrics are unavailable.")
+    if _proc is None or _proc.pid != os.getpid():
+        _proc = psutil.Process()
+        _proc_create_time = _proc.create_time()
+    return _proc
+
+
+def metrics_memory_usage() -> float:
+    """Get current memory usage in MB. Requires psutil to be installed."""
+    return _process().memory_info().rss / 1024 / 1024
+
+
+def metrics_cpu_percent() -> float:
+    """Get current CPU usage percentage. Requires psutil to be installed.
+
+    Readings are reused for up to 100ms so rapid polling does not return
+    meaningless near-zero intervals.
+    """
+    global _cpu_sample
+    if not PSUTIL_AVAILABLE:
+        raise RuntimeError("psutil is not installed. System metrics are unavailable.")
+    now = time.monotonic()
+    if _cpu_sample is None or now - _cpu_sample[1] >= _CPU_SAMPLE_TTL:
+        _cpu_sample = (psutil.cpu_percent(), now)
+    return _cpu_sample[0]
+
+
+def metrics_thread_count() -> int:
+    """Get current thread count. Requires psutil to be installed."""
+    return _process().num_threads()
+
+
+def metrics_uptime() -> float:
+    """Get process uptime in seconds. Requires psutil to be installed."""
+    _process()
+    return time.time() - _proc_create_time  # type: ignore
+
+
+def metrics_uptime_friendly() -> str:
+    """Get process uptime in a human-readable format. Requires psutil to be installed."""
+    seconds = metrics_uptime()
+    return str(timedelta(seconds=int(seconds)))
+
+
+# Namespace kept for the existing `Metrics.memory_usage()` style API; the
+# module-level functions above avoid the class attribute/staticmethod lookup.
+Metrics = SimpleNamespace(
+    memory_usage=metrics_memory_usage,
+    cpu_percent=metrics_cpu_percent,
+    thread_count=metrics_thread_count,
+    uptime=metrics_uptime,
+    uptime_friendly=metrics_uptime_friendly,
+)
 
 
+@lru_cache(maxsize=None)
 def running_under_unittest() -> bool:
     """Check if the code is being run under a unittest."""
     return 'unittest' in sys.modules
 
 
-def current_log_dir() -> str:
-    return f"{_log_directory}\\{timestamp}"
+def current_log_dir() -> Optional[str]:
+    return _current_log_dir
 
 
 def log_function_call(func: Callable) -> Callable:
     @wraps(func)
     def wrapper(*args, **kwargs):
-        debug(f"Calling function: {func.__name__}")
-        debug(f"Arguments: {args}")
-        debug(f"Keyword arguments: {kwargs}")
+        # Formatting args/kwargs can be costly; only do it when debug is on.
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            debug(f"Calling function: {func.__name__}(args={args!r}, kwargs={kwargs!r})")
         try:
             result = func(*args, **kwargs)
-            debug(f"Function {func.__name__} returned: {result}")
+            if debug_enabled:
+                debug(f"Function {func.__name__} returned: {result}")
             return result
         except Exception as e:
             error(f"Function {func.__name__} raised an exception: {e}")
@@ -109,8 +141,9 @@ def log_timing(func: Callable) -> Callable:
         start_time = time.perf_counter()
         result = func(*args, **kwargs)
         end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
-        info(f"Function {func.__name__} took {elapsed_time:.2f} seconds")
+        if logger.isEnabledFor(logging.INFO):
+            elapsed_time = end_time - start_time
+            info(f"Function {func.__name__} took {elapsed_time:.2f} seconds")
         return result
     return wrapper
 
@@ -126,38 +159,109 @@ def deprecated(message: str = "This function is deprecated.") -> Callable:
     return decorator
 
 
-def log(level, message):
+@lru_cache(maxsize=512)
+def _relative_caller_path(full_path: str) -> str:
+    """Return a caller's file path relative to the project root, using forward slashes."""
+    if full_path.startswith(_project_root_prefix):
+        relative_path = full_path[len(_project_root_prefix):]
+    else:
+        relative_path = os.path.relpath(full_path, start=_project_root)
+    return relative_path.replace("\\", "/")
+
+
+def refresh_project_root() -> None:
+    """Re-read the project root from the current working directory.
+
+    The project root is captured once at import time; call this after changing
+    directories so caller paths in log records stay relative to the new location.
+    """
+    global _project_root, _project_root_prefix
+    _project_root = os.getcwd()
+    _project_root_prefix = os.path.join(_project_root, "")
+    _relative_caller_path.cache_clear()
+
+
+def _output_handlers() -> List[logging.Handler]:
+    """Return the handlers that the background listener writes records to."""
+    return [h for h in (console_handler, _buffered_handler) if h is not None]
+
+
+def _start_listener() -> None:
+    """Start the background thread that drains the log queue, if not running."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(
+                _log_queue, *_output_handlers(), respect_handler_level=True
+            )
+            _listener.start()
+
+
+def _stop_listener() -> None:
+    """Stop the background listener, flushing any records still queued."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _reset_after_fork() -> None:
+    """Drop the parent's logging thread state in a forked child.
+
+    Threads do not survive fork(), so the child gets a fresh queue and locks,
+    starts its own listener on its first log call and restarts the periodic
+    flush if file logging is enabled. Records the parent had buffered are
+    left for the parent to write.
+    """
+    global _listener, _log_queue, _listener_lock, _flush_thread, _flush_lock
+    _listener = None
+    _listener_lock = threading.Lock()
+    _log_queue = queue.SimpleQueue()
+    _queue_handler.queue = _log_queue
+    _flush_thread = None
+    _flush_lock = threading.Lock()
+    if _buffered_handler is not None:
+        _buffered_handler.buffer.clear()
+        _start_flush_thread()
+
+
+def log(level, message, *args):
+    # Same fast path as Logger.debug() & co: skip the frame walk entirely
+    # for records the logger would discard. As with logging, `args` are
+    # %-merged into the message only when the record is emitted.
+    if not logger.isEnabledFor(level):
+        return
+    if _listener is None:
+        _start_listener()
     caller_info = logger.findCaller(stack_info=False, stacklevel=3)
-    full_path = caller_info[0]
-    project_root = os.getcwd()  # Assuming the current working directory is the project root
-    relative_path = os.path.relpath(full_path, start=project_root)
 
     extra = {
-        "caller_module": relative_path.replace("\\", "/"),
+        "caller_module": _relative_caller_path(caller_info[0]),
         "caller_func": caller_info[2],
         "caller_lineno": caller_info[1],
     }
-    logger._log(level, message, args=(), extra=extra)
+    logger._log(level, message, args=args, extra=extra)
 
 
-def debug(message):
-    log(logging.DEBUG, message)
+def debug(message, *args):
+    log(logging.DEBUG, message, *args)
 
 
-def info(message):
-    log(logging.INFO, message)
+def info(message, *args):
+    log(logging.INFO, message, *args)
 
 
-def warning(message):
-    log(logging.WARNING, message)
+def warning(message, *args):
+    log(logging.WARNING, message, *args)
 
 
-def error(message):
-    log(logging.ERROR, message)
+def error(message, *args):
+    log(logging.ERROR, message, *args)
 
 
-def critical(message):
-    log(logging.CRITICAL, message)
+def critical(message, *args):
+    log(logging.CRITICAL, message, *args)
 
 
 def max_logs(val: int) -> None:
@@ -178,47 +282,126 @@ def log_level(val: int) -> None:
         val (int): Logging level to set.
     """
     logger.setLevel(val)
-    for handler in logger.handlers:
+    for handler in logger.handlers + _output_handlers():
         handler.setLevel(val)
 
 
+def log_flush_interval(val: float) -> None:
+    """
+    Set how often buffered file log records are flushed to disk.
+
+    Records are also flushed when the buffer fills or an ERROR or higher
+    record is logged.
+
+    Args:
+        val (float): Flush interval in seconds. Values <= 0 disable periodic flushing.
+    """
+    global _flush_interval
+    _flush_interval = val
+
+
+def _flush_periodically() -> None:
+    """Flush the buffered file handler every `_flush_interval` seconds.
+
+    Exits once file logging is disabled; set_log_directory() starts a new
+    thread when it is enabled again.
+    """
+    global _flush_thread
+    while True:
+        interval = _flush_interval
+        time.sleep(interval if interval > 0 else 1.0)
+        with _flush_lock:
+            handler = _buffered_handler
+            if handler is None:
+                _flush_thread = None
+                return
+        if interval > 0:
+            handler.flush()
+
+
+def _start_flush_thread() -> None:
+    """Start the periodic flush thread, if not running."""
+    global _flush_thread
+    with _flush_lock:
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(
+                target=_flush_periodically, name="DebugManagerFlush", daemon=True
+            )
+            _flush_thread.start()
+
+
+def _close_file_handler() -> None:
+    """Flush and close the buffered file handler, if any."""
+    global _file_handler, _buffered_handler
+    if _buffered_handler:
+        _buffered_handler.close()
+        _buffered_handler = None
+    if _file_handler:
+        _file_handler.close()
+        _file_handler = None
+
+
+def _shutdown() -> None:
+    """Drain the log queue and flush file output at interpreter exit."""
+    _stop_listener()
+    _close_file_handler()
+
+
 def get_log_directory() -> Optional[str]:
     return _log_directory
 
 
 def set_log_directory(directory: Optional[str]) -> None:
-    global _file_handler, _log_directory
+    global _file_handler, _buffered_handler, _log_directory, _current_log_dir
+    global _timestamp
+
+    # Handlers are owned by the queue listener; stop it (flushing pending
+    # records) while they are swapped, and let the next log call restart it.
+    _stop_listener()
 
     if directory is None:
         if _file_handler:
-            logging.getLogger().removeHandler(_file_handler)
-            _file_handler.close()
-            _file_handler = None
+            _close_file_handler()
             info("File logging disabled.")
         _log_directory = None
+        _current_log_dir = None
     else:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-
         _log_directory = directory
-        os.makedirs(current_log_dir(), exist_ok=True)
+        if _timestamp is None:
+            # One log directory per run, named for when file logging was first enabled.
+            _timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        _current_log_dir = os.path.join(directory, _timestamp)
+        # Creates the log directory itself as well, if needed.
+        os.makedirs(_current_log_dir, exist_ok=True)
 
         log_file_path = os.path.join(current_log_dir(), "debug.log")
-        if _file_handler:
-            logger.removeHandler(_file_handler)
-            _file_handler.close()
+        _close_file_handler()
 
         _file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
         _file_handler.setFormatter(formatter)
         _file_handler.setLevel(logger.level)
-        logger.addHandler(_file_handler)
+        # Batch file writes; errors flush immediately so crash context is kept.
+        _buffered_handler = logging.handlers.MemoryHandler(
+            capacity=256,
+            flushLevel=logging.ERROR,
+            target=_file_handler,
+            flushOnClose=True,
+        )
+        _buffered_handler.setLevel(logger.level)
+
+        _start_flush_thread()
 
         info(f"File logging enabled. Logs are saved to: {log_file_path}")
 
 
 def register_debug_function(func: Callable) -> None:
     if callable(func):
-        debug_functions.append(func)
+        # Methods are grouped into one log file per class.
+        if "." in func.__qualname__:
+            log_file_name = func.__qualname__.split(".")[0]
+        else:
+            log_file_name = func.__name__
+        debug_functions.setdefault(log_file_name, []).append(func)
         debug(f"Registered exit logging function: {func.__name__}")
     else:
         warning(f"Attempted to register a non-callable object: {func}")
@@ -227,53 +410,71 @@ def register_debug_function(func: Callable) -> None:
 def run_debug_functions() -> None:
     """ Execute all registered debug functions and log their output. """
     info("Running registered exit logging functions...")
-    for func in debug_functions:
-        if "." in func.__qualname__:
-            log_file_name = func.__qualname__.split(".")[0]
-        else:
-            log_file_name = func.__name__
+    for log_file_name, funcs in debug_functions.items():
+        outputs = []
+        for func in funcs:
+            try:
+                output = func()
+                if output:
+                    outputs.append((func, output))
+            except Exception as e:
+                error(f"Error running debug function {func.__qualname__}: {e}")
+
+        if not outputs:
+            continue
 
         try:
-            output = func()
-
-            if output:
-                log_file = current_log_dir() + f"\\{log_file_name}.log"
-                file_exists_and_non_empty = os.path.exists(log_file) and os.path.getsize(log_file) > 0
-
-                with open(log_file, "a", encoding="utf-8") as f:
-                    if file_exists_and_non_empty:
+            log_file = os.path.join(current_log_dir(), f"{log_file_name}.log")  # type: ignore
+            try:
+                non_empty = os.stat(log_file).st_size > 0
+            except FileNotFoundError:
+                non_empty = False
+
+            with open(log_file, "a", encoding="utf-8") as f:
+                for func, output in outputs:
+                    if non_empty:
                         f.write("\n\n" + "*" * 80 + "\n\n\n")
                     f.write(output + "\n")
+                    non_empty = True
+            for func, _ in outputs:
                 info(f"Appended output for {func.__qualname__} to {log_file}")
         except Exception as e:
-            error(f"Error running debug function {func.__qualname__}: {e}")
+            error(f"Error writing debug output for {log_file_name}: {e}")
 
 
 def cleanup_logs() -> None:
     """ Remove old log directories, keeping only the latest as specified by max_logs. """
-    if _max_logs < 1:
+    if _max_logs < 1 or _log_directory is None:
         return
-    log_dirs = sorted(
-        [d for d in Path(_log_directory).iterdir() if d.is_dir()],  # type: ignore
-        key=lambda d: d.name
-    )
-    keep_count = len(log_dirs) - _max_logs
-    if keep_count > 0:
-        excess_dirs = log_dirs[:keep_count]
-        for old_dir in excess_dirs:
-            for item in old_dir.iterdir():
-                item.unlink()
-            old_dir.rmdir()
-            info(f"Removed old log directory: {old_dir}")
+    with os.scandir(_log_directory) as entries:
+        log_dirs = sorted(e.path for e in entries if e.is_dir(follow_symlinks=False))
+    for old_dir in log_dirs[:max(len(log_dirs) - _max_logs, 0)]:
+        shutil.rmtree(old_dir)
+        info(f"Removed old log directory: {old_dir}")
 
 
 # Global variables
-timestamp: str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+_proc: Optional["psutil.Process"] = None
+_proc_create_time: Optional[float] = None
+_cpu_sample: Optional[Tuple[float, float]] = None
+_CPU_SAMPLE_TTL: float = 0.1  # seconds
+_timestamp: Optional[str] = None
 _max_logs: int = -1
+_project_root: str = os.getcwd()  # Assuming the current working directory is the project root
+_project_root_prefix: str = os.path.join(_project_root, "")
 _log_directory: Optional[str] = None
+_current_log_dir: Optional[str] = None
 _file_handler: Optional[logging.FileHandler] = None
+_buffered_handler: Optional[logging.handlers.MemoryHandler] = None
+_flush_interval: float = 1.0
+_flush_thread: Optional[threading.Thread] = None
+_flush_lock = threading.Lock()
+console_handler: Optional[logging.StreamHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
 debug_visuals: bool = False
-debug_functions: List[Callable] = []
+debug_functions: Dict[str, List[Callable]] = {}
 
 # Configure a dedicated logger for DebugManager
 logger: logging.Logger = logging.getLogger("DebugManager")
@@ -282,8 +483,16 @@ formatter = logging.Formatter(
     "%(asctime)s - %(levelname)s - %(caller_module)s.%(caller_func)s:%(caller_lineno)d - %(message)s"
 )
 
+# Records are only enqueued on the caller's thread; formatting and console/file
+# output happen on the QueueListener thread started by the first log call.
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+logger.addHandler(_queue_handler)
+
 if not running_under_unittest():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 logger.propagate = False
+
+atexit.register(_shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
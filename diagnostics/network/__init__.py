@@ -1,25 +1,37 @@
 """Network diagnostics module.
 
 This module provides comprehensive network diagnostics capabilities including:
-- Network interface statistics
+- Network interface statistics and throughput sampling
 - Connection monitoring
 - Latency measurements
 - DNS resolution
 - SSL/TLS certificate validation
+
+The implementation (and its psutil/ssl dependencies) is only imported the
+first time one of the exported classes is accessed; cryptography is only
+imported once a DER certificate actually has to be decoded.
 """
 
-from .network import (
-    NetworkMetrics,
-    ConnectionMonitor,
-    LatencyMonitor,
-    DNSMonitor,
-    SSLCertMonitor,
-)
+import importlib
 
 __all__ = [
     "NetworkMetrics",
+    "IncrementalSampler",
     "ConnectionMonitor",
     "LatencyMonitor",
     "DNSMonitor",
     "SSLCertMonitor",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(".network", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
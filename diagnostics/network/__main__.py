@@ -8,7 +8,7 @@ Run with: python -m diagnostics.network [command] [options]
 import argparse
 import json
 import sys
-from typing import Optional
+from typing import List, Optional
 
 from .network import (
     NetworkMetrics,
@@ -24,6 +24,13 @@ def format_json(data: dict) -> str:
     return json.dumps(data, indent=2)
 
 
+def write_lines(lines: List[str]) -> None:
+    """Write collected output lines to stdout with a single write and flush."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
 def main() -> Optional[int]:
     """Main entry point for the network diagnostics CLI."""
     parser = argparse.ArgumentParser(
@@ -32,28 +39,28 @@ def main() -> Optional[int]:
     )
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # Network metrics command
-    metrics_parser = subparsers.add_parser(
-        "metrics", help="Show network interface metrics"
-    )
-    metrics_parser.add_argument(
+    # Options shared by every command
+    json_parent = argparse.ArgumentParser(add_help=False)
+    json_parent.add_argument(
         "--json", action="store_true", help="Output in JSON format"
     )
 
+    # Network metrics command
+    subparsers.add_parser(
+        "metrics", parents=[json_parent], help="Show network interface metrics"
+    )
+
     # Connections command
     conn_parser = subparsers.add_parser(
-        "connections", help="Show network connections"
+        "connections", parents=[json_parent], help="Show network connections"
     )
     conn_parser.add_argument(
         "--status", help="Filter connections by status"
     )
-    conn_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
 
     # Latency command
     latency_parser = subparsers.add_parser(
-        "latency", help="Measure network latency"
+        "latency", parents=[json_parent], help="Measure network latency"
     )
     latency_parser.add_argument("host", help="Host to measure latency to")
     latency_parser.add_argument(
@@ -62,30 +69,21 @@ def main() -> Optional[int]:
     latency_parser.add_argument(
         "--count", type=int, default=5, help="Number of measurements (default: 5)"
     )
-    latency_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
 
     # DNS command
     dns_parser = subparsers.add_parser(
-        "dns", help="DNS resolution and cache info"
+        "dns", parents=[json_parent], help="DNS resolution and cache info"
     )
     dns_parser.add_argument("hostname", help="Hostname to resolve")
-    dns_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
 
     # SSL command
     ssl_parser = subparsers.add_parser(
-        "ssl", help="SSL/TLS certificate information"
+        "ssl", parents=[json_parent], help="SSL/TLS certificate information"
     )
     ssl_parser.add_argument("hostname", help="Host to check certificate for")
     ssl_parser.add_argument(
         "--port", type=int, default=443, help="Port to connect to (default: 443)"
     )
-    ssl_parser.add_argument(
-        "--json", action="store_true", help="Output in JSON format"
-    )
 
     args = parser.parse_args()
 
@@ -93,24 +91,25 @@ def main() -> Optional[int]:
         parser.print_help()
         return 0
 
+    lines: List[str] = []
     try:
         if args.command == "metrics":
             metrics = NetworkMetrics()
             data = {
                 "interfaces": metrics.get_interface_stats(),
-                "connections": metrics.get_connections(),
+                "connections": [conn._asdict() for conn in metrics.get_connections()],
             }
             if args.json:
-                print(format_json(data))
+                lines.append(format_json(data))
             else:
-                print("Network Interfaces:")
+                lines.append("Network Interfaces:")
                 for interface, stats in data["interfaces"].items():
-                    print(f"\n{interface}:")
+                    lines.append(f"\n{interface}:")
                     for key, value in stats.items():
-                        print(f"  {key}: {value}")
-                print("\nActive Connections:")
+                        lines.append(f"  {key}: {value}")
+                lines.append("\nActive Connections:")
                 for conn in data["connections"]:
-                    print(f"\n  {conn}")
+                    lines.append(f"\n  {conn}")
 
         elif args.command == "connections":
             monitor = ConnectionMonitor()
@@ -119,30 +118,34 @@ def main() -> Optional[int]:
             else:
                 data = monitor.get_connection_summary()
             if args.json:
-                print(format_json(data))
+                lines.append(format_json(data))
             else:
                 if args.status:
-                    print(f"\nConnections with status '{args.status}':")
+                    lines.append(f"\nConnections with status '{args.status}':")
                     for conn in data:
-                        print(f"  {conn}")
+                        lines.append(f"  {conn}")
                 else:
-                    print("\nConnection Summary:")
+                    lines.append("\nConnection Summary:")
                     for status, count in data.items():
-                        print(f"  {status}: {count}")
+                        lines.append(f"  {status}: {count}")
 
         elif args.command == "latency":
+            from concurrent.futures import ThreadPoolExecutor
+
             monitor = LatencyMonitor()
-            latencies = []
-            for _ in range(args.count):
-                latency = monitor.measure_latency(args.host, args.port)
-                if latency is not None:
-                    latencies.append(latency)
-                else:
-                    print(
-                        f"Failed to measure latency to {args.host}",
-                        file=sys.stderr
-                    )
-                    return 1
+            # Connects block on the network, not the GIL, so overlap them.
+            with ThreadPoolExecutor(max_workers=max(1, min(args.count, 16))) as executor:
+                results = list(executor.map(
+                    lambda _: monitor.measure_latency(args.host, args.port),
+                    range(args.count),
+                ))
+            latencies = [latency for latency in results if latency is not None]
+            if not latencies:
+                print(
+                    f"Failed to measure latency to {args.host}",
+                    file=sys.stderr
+                )
+                return 1
 
             data = {
                 "host": args.host,
@@ -155,15 +158,15 @@ def main() -> Optional[int]:
                 }
             }
             if args.json:
-                print(format_json(data))
+                lines.append(format_json(data))
             else:
-                print(f"\nLatency to {args.host}:")
-                print(f"  Min: {data['stats']['min']:.3f}s")
-                print(f"  Max: {data['stats']['max']:.3f}s")
-                print(f"  Avg: {data['stats']['avg']:.3f}s")
-                print("\nMeasurements:")
+                lines.append(f"\nLatency to {args.host}:")
+                lines.append(f"  Min: {data['stats']['min']:.3f}s")
+                lines.append(f"  Max: {data['stats']['max']:.3f}s")
+                lines.append(f"  Avg: {data['stats']['avg']:.3f}s")
+                lines.append("\nMeasurements:")
                 for i, latency in enumerate(data["measurements"], 1):
-                    print(f"  {i}: {latency:.3f}s")
+                    lines.append(f"  {i}: {latency:.3f}s")
 
         elif args.command == "dns":
             monitor = DNSMonitor()
@@ -178,15 +181,15 @@ def main() -> Optional[int]:
                 "cache_stats": monitor.get_cache_stats(),
             }
             if args.json:
-                print(format_json(data))
+                lines.append(format_json(data))
             else:
-                print(f"\nDNS Resolution for {args.hostname}:")
-                print("IP Addresses:")
+                lines.append(f"\nDNS Resolution for {args.hostname}:")
+                lines.append("IP Addresses:")
                 for ip in data["ip_addresses"]:
-                    print(f"  {ip}")
-                print("\nCache Statistics:")
+                    lines.append(f"  {ip}")
+                lines.append("\nCache Statistics:")
                 for key, value in data["cache_stats"].items():
-                    print(f"  {key}: {value}")
+                    lines.append(f"  {key}: {value}")
 
         elif args.command == "ssl":
             monitor = SSLCertMonitor()
@@ -205,26 +208,27 @@ def main() -> Optional[int]:
                 "cache_stats": monitor.get_cache_stats(),
             }
             if args.json:
-                print(format_json(data))
+                lines.append(format_json(data))
             else:
-                print(f"\nSSL Certificate for {args.hostname}:")
-                print("\nSubject:")
+                lines.append(f"\nSSL Certificate for {args.hostname}:")
+                lines.append("\nSubject:")
                 for key, value in data["certificate"]["subject"].items():
-                    print(f"  {key}: {value}")
-                print("\nIssuer:")
+                    lines.append(f"  {key}: {value}")
+                lines.append("\nIssuer:")
                 for key, value in data["certificate"]["issuer"].items():
-                    print(f"  {key}: {value}")
-                print("\nValidity:")
-                print(f"  Not Before: {data['certificate']['not_before']}")
-                print(f"  Not After: {data['certificate']['not_after']}")
-                print(
+                    lines.append(f"  {key}: {value}")
+                lines.append("\nValidity:")
+                lines.append(f"  Not Before: {data['certificate']['not_before']}")
+                lines.append(f"  Not After: {data['certificate']['not_after']}")
+                lines.append(
                     f"  Serial Number: {data['certificate']['serial_number']}"
                 )
-                print(f"  Version: {data['certificate']['version']}")
-                print("\nCache Statistics:")
+                lines.append(f"  Version: {data['certificate']['version']}")
+                lines.append("\nCache Statistics:")
                 for key, value in data["cache_stats"].items():
-                    print(f"  {key}: {value}")
+                    lines.append(f"  {key}: {value}")
 
+        write_lines(lines)
         return 0
 
     except KeyboardInterrupt:
@@ -3,28 +3,247 @@
 This module provides various network diagnostic tools and metrics collection.
 """
 
+import array
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import selectors
 import socket
 import ssl
+import struct
+import threading
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import (
+    TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional,
+    Sequence, Set, Tuple, Union,
+)
 from urllib.parse import urlparse
 
 import psutil
 import requests
-from cryptography import x509
-from cryptography.hazmat.backends import default_backend
-from cryptography.x509.oid import NameOID
 
 from .. import debug, error, info, warning
 
+if TYPE_CHECKING:
+    # cryptography is only imported when a DER certificate has to be parsed
+    from cryptography import x509
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        warning(f"Ignoring invalid {name}={os.environ[name]!r}; using {default}")
+        return default
+
+
+class _ConnCache:
+    """Process-wide cache of `psutil.net_connections()` results.
+
+    Scanning connections walks /proc/net/* and every open fd, so results are
+    shared between callers for a short TTL (DIAG_CONN_CACHE_TTL, default 5s).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, list]] = {}
+
+    def get(self, kind: str = "inet", ttl: Optional[float] = None) -> list:
+        """Get connections of the given kind, rescanning if the cache is stale.
+
+        Args:
+            kind: psutil connection kind filter (e.g. "inet", "tcp", "all")
+            ttl: Maximum age in seconds of a cached result (default: self.ttl)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            now = time.monotonic()
+            cached = self._entries.get(kind)
+            if cached is not None and now - cached[0] < ttl:
+                return cached[1]
+            connections = psutil.net_connections(kind=kind)
+            self._entries[kind] = (now, connections)
+            return connections
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+_conn_cache = _ConnCache(_env_float("DIAG_CONN_CACHE_TTL", 5.0))
+
+
+class _LRUCache(OrderedDict):
+    """Dict bounded to `maxsize` entries, evicting the least recently used.
+
+    If `expiry` is given it maps a value to its expiry time, and the number of
+    unexpired entries is tracked incrementally with a min-heap of expiry
+    times so `live_count()` does not have to scan the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024,
+                 expiry: Optional[Callable[[Any], float]] = None):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._expiry = expiry
+        self._expiry_heap: List[Tuple[float, int, Any]] = []
+        self._live: Dict[Any, int] = {}  # key -> heap sequence of live entry
+        self._seq = itertools.count()
+        super().__init__()
+
+    def get(self, key, default=None):
+        """Get an entry and mark it as most recently used."""
+        with self._lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return self[key]
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if self._expiry is not None:
+                # Any heap entry for a previous value of key is now stale
+                seq = next(self._seq)
+                self._live[key] = seq
+                heapq.heappush(self._expiry_heap, (self._expiry(value), seq, key))
+                if len(self._expiry_heap) > 2 * self.maxsize:
+                    self._compact_heap()
+            if len(self) > self.maxsize:
+                evicted, _ = self.popitem(last=False)
+                self._live.pop(evicted, None)
+
+    def _compact_heap(self) -> None:
+        """Drop heap entries for overwritten or evicted values."""
+        self._expiry_heap = [item for item in self._expiry_heap
+                             if self._live.get(item[2]) == item[1]]
+        heapq.heapify(self._expiry_heap)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._expiry_heap.clear()
+            self._live.clear()
+
+    def live_count(self, now: float) -> int:
+        """Number of entries whose expiry is still after `now`."""
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, seq, key = heapq.heappop(heap)
+                if self._live.get(key) == seq:
+                    del self._live[key]
+            return len(self._live)
+
+
+# Per-thread results cached for the duration of a NetworkMetrics.oneshot() block
+_oneshot = threading.local()
+
+
+def _oneshot_get(key: Tuple, fetch: Callable[[], Any]) -> Any:
+    """Call `fetch`, reusing its result within the current oneshot() block."""
+    cache = getattr(_oneshot, "cache", None)
+    if cache is None:
+        return fetch()
+    if key not in cache:
+        cache[key] = fetch()
+    return cache[key]
+
+
+def _get_connections_cached(kind: str = "inet", ttl: Optional[float] = None) -> list:
+    """Get `psutil.net_connections(kind)`, shared across callers for `ttl` seconds."""
+    return _oneshot_get(("connections", kind), lambda: _conn_cache.get(kind, ttl))
+
+
+def _get_io_counters() -> Dict:
+    """Get per-interface `psutil.net_io_counters`, reused within oneshot()."""
+    return _oneshot_get(
+        ("io_counters",), lambda: psutil.net_io_counters(pernic=True, nowrap=True)
+    )
+
+
+def _get_if_stats() -> Dict:
+    """Get `psutil.net_if_stats`, reused within oneshot()."""
+    return _oneshot_get(("if_stats",), psutil.net_if_stats)
+
+
+class ConnRow(NamedTuple):
+    """A network connection as returned by NetworkMetrics.get_connections."""
+
+    fd: int
+    family: int
+    type: int
+    local_addr: Tuple
+    remote_addr: Tuple
+    status: str
+    pid: Optional[int]
+
+
+class NetworkSnapshot(NamedTuple):
+    """Network counters, interface flags and connections read together."""
+
+    io_counters: Dict
+    if_stats: Dict
+    connections: list
+    timestamp: float
+
 
 class NetworkMetrics:
     """Collect and provide network interface statistics."""
 
     @staticmethod
-    def get_interface_stats() -> Dict[str, Dict[str, Union[int, float]]]:
+    @contextlib.contextmanager
+    def oneshot() -> Iterator[None]:
+        """Reuse psutil network reads for the duration of a with block.
+
+        Like `psutil.Process.oneshot()`: within the block, interface counters,
+        interface flags and connections are read at most once per thread, so
+        combining several metrics costs one pass over /proc/net.
+        """
+        if getattr(_oneshot, "cache", None) is not None:
+            yield  # nested; the outermost block owns the cache
+            return
+        _oneshot.cache = {}
+        try:
+            yield
+        finally:
+            _oneshot.cache = None
+
+    @staticmethod
+    def snapshot(kind: str = "inet") -> NetworkSnapshot:
+        """Read interface counters, interface flags and connections at once.
+
+        The result can be passed to get_interface_stats, get_connections and
+        ConnectionMonitor.update so they do not query psutil again.
+
+        Args:
+            kind: psutil connection kind filter (e.g. "inet", "tcp", "all")
+        """
+        return NetworkSnapshot(
+            io_counters=_get_io_counters(),
+            if_stats=_get_if_stats(),
+            connections=_get_connections_cached(kind),
+            timestamp=time.monotonic(),
+        )
+
+    @staticmethod
+    def get_interface_stats(
+        snapshot: Optional[NetworkSnapshot] = None,
+    ) -> Dict[str, Dict[str, Union[int, float]]]:
         """Get statistics for all network interfaces.
+
+        Args:
+            snapshot: Use the counters from this snapshot instead of reading them
         
         Returns:
             Dict mapping interface names to their statistics including:
@@ -37,39 +256,41 @@ class NetworkMetrics:
             - dropin: Total packets dropped on receive
             - dropout: Total packets dropped on send
         """
-        stats = {}
-        for interface, addrs in psutil.net_if_stats().items():
-            try:
-                stats[interface] = {
-                    "bytes_sent": addrs.bytes_sent,
-                    "bytes_recv": addrs.bytes_recv,
-                    "packets_sent": addrs.packets_sent,
-                    "packets_recv": addrs.packets_recv,
-                    "errin": addrs.errin,
-                    "errout": addrs.errout,
-                    "dropin": addrs.dropin,
-                    "dropout": addrs.dropout,
-                }
-            except AttributeError:
-                # Some interfaces might not have all stats
-                stats[interface] = {
-                    "bytes_sent": 0,
-                    "bytes_recv": 0,
-                    "packets_sent": 0,
-                    "packets_recv": 0,
-                    "errin": 0,
-                    "errout": 0,
-                    "dropin": 0,
-                    "dropout": 0,
-                }
-        return stats
+        # net_io_counters reads all per-NIC counters in one pass (/proc/net/dev
+        # on Linux); net_if_stats only carries link info such as speed and MTU.
+        counters = snapshot.io_counters if snapshot is not None else _get_io_counters()
+        return {interface: c._asdict() for interface, c in counters.items()}
+
+    @staticmethod
+    def sample_throughput(interval: float = 1.0) -> Dict[str, Dict[str, float]]:
+        """Measure per-interface throughput over an interval.
+
+        Args:
+            interval: Seconds to sample for
+
+        Returns:
+            Dict mapping interface names to bytes/packets sent/received per second
+        """
+        sampler = IncrementalSampler()
+        sampler.sample()
+        time.sleep(interval)
+        return sampler.sample()
 
     @staticmethod
-    def get_connections() -> List[Dict[str, Union[str, int]]]:
+    def get_connections(
+        kind: str = "inet", snapshot: Optional[NetworkSnapshot] = None
+    ) -> List[ConnRow]:
         """Get all network connections.
+
+        Results are cached process-wide for DIAG_CONN_CACHE_TTL seconds.
+
+        Args:
+            kind: psutil connection kind filter (e.g. "inet", "tcp", "all")
+            snapshot: Use the connections from this snapshot (taken with its
+                own kind) instead of reading them
         
         Returns:
-            List of dictionaries containing connection information:
+            List of ConnRow tuples containing connection information:
             - fd: File descriptor
             - family: Address family (IPv4/IPv6)
             - type: Socket type
@@ -78,44 +299,109 @@ class NetworkMetrics:
             - status: Connection status
             - pid: Process ID
         """
-        connections = []
-        for conn in psutil.net_connections():
-            connections.append({
-                "fd": conn.fd,
-                "family": conn.family,
-                "type": conn.type,
-                "local_addr": conn.laddr,
-                "remote_addr": conn.raddr,
-                "status": conn.status,
-                "pid": conn.pid,
-            })
-        return connections
+        return [
+            ConnRow(conn.fd, conn.family, conn.type, conn.laddr, conn.raddr,
+                    conn.status, conn.pid)
+            for conn in (snapshot.connections if snapshot is not None
+                         else _get_connections_cached(kind))
+        ]
+
+    @staticmethod
+    def get_connection_columns(kind: str = "inet") -> Dict[str, Sequence]:
+        """Get all network connections as parallel columns.
+
+        Cheaper than a list of rows when only aggregate statistics (status
+        histograms, per-PID counts) are needed; the integer columns are
+        `array.array`s and can be handed to numpy without copying.
+
+        Args:
+            kind: psutil connection kind filter (e.g. "inet", "tcp", "all")
+
+        Returns:
+            Dict mapping each ConnRow field name to a sequence of values, one
+            per connection. Missing PIDs are reported as -1.
+        """
+        connections = _get_connections_cached(kind)
+        return {
+            "fd": array.array("i", (conn.fd for conn in connections)),
+            "family": array.array("i", (conn.family for conn in connections)),
+            "type": array.array("i", (conn.type for conn in connections)),
+            "local_addr": [conn.laddr for conn in connections],
+            "remote_addr": [conn.raddr for conn in connections],
+            "status": [conn.status for conn in connections],
+            "pid": array.array(
+                "i", (-1 if conn.pid is None else conn.pid for conn in connections)
+            ),
+        }
+
+
+_RATE_FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv")
+
+
+class IncrementalSampler:
+    """Report interface throughput since the previous sample."""
+
+    def __init__(self):
+        self._prev: Optional[Dict] = None
+        self._prev_time = 0.0
+
+    def sample(self) -> Dict[str, Dict[str, float]]:
+        """Take a counter snapshot and return rates since the previous one.
+
+        The first call only records the baseline and returns an empty dict.
+
+        Returns:
+            Dict mapping interface names to rates, e.g. bytes_sent_per_sec
+        """
+        counters = psutil.net_io_counters(pernic=True, nowrap=True)
+        now = time.monotonic()
+        prev, elapsed = self._prev, now - self._prev_time
+        self._prev, self._prev_time = counters, now
+        if prev is None or elapsed <= 0:
+            return {}
+
+        rates = {}
+        for interface, current in counters.items():
+            previous = prev.get(interface)
+            if previous is None:
+                continue
+            rates[interface] = {
+                # Modulo keeps the delta correct if a 64-bit counter wrapped
+                f"{field}_per_sec": (
+                    (getattr(current, field) - getattr(previous, field)) % 2**64
+                ) / elapsed
+                for field in _RATE_FIELDS
+            }
+        return rates
 
 
 class ConnectionMonitor:
     """Monitor network connections and their states."""
 
     def __init__(self):
-        self._connections: Dict[str, List[Dict]] = {}
-        self._last_check = 0
+        # Only the per-status counts are computed on update; connection
+        # details are built from the snapshot when a status is asked for.
+        self._snapshot: list = []
+        self._counts: Counter = Counter()
+        self._last_check: Optional[float] = None
         self._check_interval = 1.0  # seconds
 
-    def update(self) -> None:
-        """Update connection statistics."""
-        current_time = time.time()
-        if current_time - self._last_check < self._check_interval:
+    def update(self, snapshot: Optional[NetworkSnapshot] = None) -> None:
+        """Update connection statistics.
+
+        Args:
+            snapshot: Use the connections from this snapshot instead of reading
+                them; always applied, regardless of the check interval
+        """
+        current_time = time.monotonic()
+        if snapshot is None and (
+                self._last_check is not None
+                and current_time - self._last_check < self._check_interval):
             return
 
-        self._connections = {}
-        for conn in psutil.net_connections():
-            status = conn.status
-            if status not in self._connections:
-                self._connections[status] = []
-            self._connections[status].append({
-                "local": conn.laddr,
-                "remote": conn.raddr,
-                "pid": conn.pid,
-            })
+        self._snapshot = (snapshot.connections if snapshot is not None
+                          else _get_connections_cached())
+        self._counts = Counter(conn.status for conn in self._snapshot)
         self._last_check = current_time
 
     def get_connection_summary(self) -> Dict[str, int]:
@@ -125,7 +411,7 @@ class ConnectionMonitor:
             Dict mapping connection status to count
         """
         self.update()
-        return {status: len(conns) for status, conns in self._connections.items()}
+        return dict(self._counts)
 
     def get_connections_by_status(self, status: str) -> List[Dict]:
         """Get all connections with a specific status.
@@ -137,15 +423,119 @@ class ConnectionMonitor:
             List of connection details
         """
         self.update()
-        return self._connections.get(status, [])
+        if not self._counts[status]:
+            return []
+        return [
+            {"local": conn.laddr, "remote": conn.raddr, "pid": conn.pid}
+            for conn in self._snapshot
+            if conn.status == status
+        ]
+
+
+# struct linger {l_onoff=1, l_linger=0}: close() sends RST immediately
+_LINGER_RESET = struct.pack("ii", 1, 0)
+# Leading fields of Linux struct tcp_info: 8 x u8, then u32s; tcpi_rtt is the 16th u32
+_TCP_INFO_FORMAT = "8B16I"
+_TCP_INFO_RTT_INDEX = 8 + 15
+
+
+def _tcp_info_rtt(sock: socket.socket) -> Optional[float]:
+    """Get the kernel-measured smoothed RTT of a connected TCP socket.
+
+    Args:
+        sock: Connected TCP socket
+
+    Returns:
+        RTT in seconds, or None where TCP_INFO is unavailable (non-Linux)
+    """
+    if not hasattr(socket, "TCP_INFO"):
+        return None
+    try:
+        raw = sock.getsockopt(
+            socket.IPPROTO_TCP, socket.TCP_INFO, struct.calcsize(_TCP_INFO_FORMAT)
+        )
+        rtt_us = struct.unpack(_TCP_INFO_FORMAT, raw)[_TCP_INFO_RTT_INDEX]
+    except (socket.error, struct.error):
+        return None
+    return rtt_us / 1_000_000 if rtt_us else None
+
+
+class _RunningStats:
+    """Min/max/mean/variance of a sliding window, updated per sample.
+
+    Mean and variance use Welford's algorithm. Removing samples is not
+    numerically stable, so the stats are rebuilt from the window every
+    `RECOMPUTE_EVERY` evictions; min/max are rescanned only when the evicted
+    sample was the current extreme.
+    """
+
+    __slots__ = ("count", "mean", "m2", "minv", "maxv", "evictions")
+
+    RECOMPUTE_EVERY = 100
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minv = float("inf")
+        self.maxv = float("-inf")
+        self.evictions = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.minv:
+            self.minv = value
+        if value > self.maxv:
+            self.maxv = value
+
+    def evict(self, value: float, window: Deque[float]) -> None:
+        """Remove `value`, which has already been dropped from `window`."""
+        self.evictions += 1
+        if self.evictions % self.RECOMPUTE_EVERY == 0 or self.count <= 1:
+            self.reset(window)
+            return
+        self.count -= 1
+        old_mean = self.mean
+        self.mean -= (value - self.mean) / self.count
+        self.m2 = max(self.m2 - (value - old_mean) * (value - self.mean), 0.0)
+        if value <= self.minv:
+            self.minv = min(window, default=float("inf"))
+        if value >= self.maxv:
+            self.maxv = max(window, default=float("-inf"))
+
+    def reset(self, window: Deque[float]) -> None:
+        """Recompute from scratch over the samples in `window`."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minv = float("inf")
+        self.maxv = float("-inf")
+        for value in window:
+            self.add(value)
 
 
 class LatencyMonitor:
     """Monitor network latency to specified hosts."""
 
-    def __init__(self):
-        self._latencies: Dict[str, List[float]] = {}
-        self._last_check = 0
+    def __init__(
+        self, max_samples: int = 100, clock: Optional[Callable[[], float]] = None
+    ):
+        """Initialize the monitor.
+
+        Args:
+            max_samples: Number of recent samples kept per host
+            clock: Monotonic time source in seconds (default: time.monotonic)
+        """
+        self._clock = clock or time.monotonic
+        # Bounded ring buffer of recent samples per host, plus running stats
+        # so queries don't need a pass over the buffer.
+        self._max_samples = max_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats: Dict[str, _RunningStats] = {}
+        self._last_check: Optional[float] = None
         self._check_interval = 5.0  # seconds
 
     def measure_latency(self, host: str, port: int = 80, timeout: float = 1.0) -> Optional[float]:
@@ -159,17 +549,179 @@ class LatencyMonitor:
         Returns:
             Latency in seconds or None if measurement failed
         """
-        start_time = time.time()
+        start_time = self._clock()
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            sock.connect((host, port))
-            latency = time.time() - start_time
-            sock.close()
-            return latency
+            # create_connection resolves the host and tries each address
+            # (IPv4 and IPv6) in turn.
+            sock = socket.create_connection((host, port), timeout=timeout)
         except (socket.timeout, socket.error) as e:
             warning(f"Failed to measure latency to {host}: {e}")
             return None
+        latency = self._clock() - start_time
+        try:
+            # Prefer the kernel's RTT estimate, which excludes name resolution
+            # and scheduling delays in this process.
+            kernel_rtt = _tcp_info_rtt(sock)
+            if kernel_rtt is not None:
+                latency = kernel_rtt
+            # Reset instead of a FIN handshake so closing costs nothing.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+        except socket.error:
+            pass
+        finally:
+            sock.close()
+        return latency
+
+    def measure_many(
+        self, targets: List[Tuple[str, int]], timeout: float = 1.0
+    ) -> Dict[Tuple[str, int], Optional[float]]:
+        """Measure latency to several hosts concurrently.
+
+        Args:
+            targets: (host, port) pairs to measure
+            timeout: Connection timeout in seconds
+
+        Returns:
+            Dict mapping each (host, port) to its latency in seconds, or None if it failed
+        """
+        if not targets:
+            return {}
+        results: Dict[Tuple[str, int], Optional[float]] = {}
+        with ThreadPoolExecutor(max_workers=min(32, len(targets))) as executor:
+            futures = {
+                executor.submit(self.measure_latency, host, port, timeout): (host, port)
+                for host, port in targets
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def measure_many_nonblocking(
+        self, targets: List[Tuple[str, int]], timeout: float = 1.0
+    ) -> Dict[Tuple[str, int], Optional[float]]:
+        """Measure latency to several hosts from one thread with a selector.
+
+        All connects are started non-blocking and completions are collected
+        from a single selector, so N probes cost one wait instead of N threads.
+        Host names are resolved up front and not included in the latency.
+
+        Args:
+            targets: (host, port) pairs to measure
+            timeout: Overall timeout in seconds for all connections
+
+        Returns:
+            Dict mapping each (host, port) to its latency in seconds, or None if it failed
+        """
+        results: Dict[Tuple[str, int], Optional[float]] = {}
+        with selectors.DefaultSelector() as selector:
+            for host, port in targets:
+                results[(host, port)] = None
+                try:
+                    family, type_, proto, _, address = socket.getaddrinfo(
+                        host, port, type=socket.SOCK_STREAM
+                    )[0]
+                    sock = socket.socket(family, type_, proto)
+                except socket.error as e:
+                    warning(f"Failed to measure latency to {host}: {e}")
+                    continue
+                sock.setblocking(False)
+                start_time = self._clock()
+                try:
+                    sock.connect(address)
+                except BlockingIOError:
+                    # In progress; EINPROGRESS on POSIX, WSAEWOULDBLOCK on Windows
+                    pass
+                except socket.error as e:
+                    warning(f"Failed to measure latency to {host}: {e}")
+                    sock.close()
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE, (host, port, start_time))
+
+            deadline = self._clock() + timeout
+            while selector.get_map():
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    latency = self._clock() - key.data[2]
+                    sock = key.fileobj
+                    selector.unregister(sock)
+                    err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if err:
+                        warning(f"Failed to measure latency to {key.data[0]}: "
+                                f"{os.strerror(err)}")
+                    else:
+                        kernel_rtt = _tcp_info_rtt(sock)
+                        results[key.data[:2]] = latency if kernel_rtt is None else kernel_rtt
+                        try:
+                            sock.setsockopt(
+                                socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET
+                            )
+                        except socket.error:
+                            pass
+                    sock.close()
+
+            for key in list(selector.get_map().values()):
+                warning(f"Failed to measure latency to {key.data[0]}: timed out")
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+        return results
+
+    async def measure_latency_async(
+        self, host: str, port: int = 80, timeout: float = 1.0
+    ) -> Optional[float]:
+        """Measure latency to a host from an asyncio event loop.
+
+        Measured like `measure_latency`: the kernel's RTT estimate where
+        TCP_INFO is available, otherwise the time to resolve and connect.
+
+        Args:
+            host: Host to measure latency to
+            port: Port to connect to
+            timeout: Connection timeout in seconds
+
+        Returns:
+            Latency in seconds or None if measurement failed
+        """
+        start_time = self._clock()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout
+            )
+        except (asyncio.TimeoutError, OSError) as e:
+            warning(f"Failed to measure latency to {host}: {e}")
+            return None
+        latency = self._clock() - start_time
+        sock = writer.get_extra_info("socket")
+        try:
+            kernel_rtt = _tcp_info_rtt(sock)
+            if kernel_rtt is not None:
+                latency = kernel_rtt
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+        except socket.error:
+            pass
+        finally:
+            writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return latency
+
+    async def measure_many_async(
+        self, targets: List[Tuple[str, int]], timeout: float = 1.0
+    ) -> Dict[Tuple[str, int], Optional[float]]:
+        """Measure latency to several hosts concurrently from an event loop.
+
+        Args:
+            targets: (host, port) pairs to measure
+            timeout: Connection timeout in seconds
+
+        Returns:
+            Dict mapping each (host, port) to its latency in seconds, or None if it failed
+        """
+        latencies = await asyncio.gather(
+            *(self.measure_latency_async(host, port, timeout) for host, port in targets)
+        )
+        return dict(zip(targets, latencies))
 
     def track_latency(self, host: str, port: int = 80) -> None:
         """Track latency to a host over time.
@@ -178,31 +730,32 @@ class LatencyMonitor:
             host: Host to track latency for
             port: Port to connect to
         """
-        current_time = time.time()
-        debug(f"track_latency called for {host} at time {current_time}")
-        debug(f"Last check was at {self._last_check}")
-        debug(f"Check interval is {self._check_interval}")
-        
-        if current_time - self._last_check < self._check_interval:
-            debug(f"Skipping measurement - within check interval")
+        current_time = self._clock()
+        if (self._last_check is not None
+                and current_time - self._last_check < self._check_interval):
+            debug("Skipping latency measurement for %s - within check interval", host)
             return
 
         latency = self.measure_latency(host, port)
-        debug(f"Measured latency: {latency}")
-        
         if latency is not None:
-            if host not in self._latencies:
-                debug(f"Creating new entry for {host}")
-                self._latencies[host] = []
-            self._latencies[host].append(latency)
-            debug(f"Added latency {latency} for {host}")
-            # Keep only last 100 measurements
-            self._latencies[host] = self._latencies[host][-100:]
+            self._record_latency(host, latency)
+            debug("Recorded latency %s for %s", latency, host)
         else:
-            debug(f"No latency measurement recorded for {host}")
+            debug("No latency measurement recorded for %s", host)
         
         self._last_check = current_time
-        debug(f"Updated last check time to {self._last_check}")
+
+    def _record_latency(self, host: str, latency: float) -> None:
+        """Store a latency sample, evicting the oldest once the buffer is full."""
+        samples = self._latencies.get(host)
+        if samples is None:
+            samples = self._latencies[host] = deque(maxlen=self._max_samples)
+            self._stats[host] = _RunningStats()
+        stats = self._stats[host]
+        if len(samples) == samples.maxlen:
+            stats.evict(samples.popleft(), samples)
+        samples.append(latency)
+        stats.add(latency)
 
     def get_latency_stats(self, host: str) -> Optional[Dict[str, float]]:
         """Get latency statistics for a host.
@@ -211,25 +764,52 @@ class LatencyMonitor:
             host: Host to get statistics for
             
         Returns:
-            Dict containing min, max, avg latency or None if no data
+            Dict containing min, max, avg latency and its standard deviation,
+            or None if no data
         """
-        if host not in self._latencies or not self._latencies[host]:
+        stats = self._stats.get(host)
+        if stats is None or not stats.count:
             return None
 
-        latencies = self._latencies[host]
         return {
-            "min": min(latencies),
-            "max": max(latencies),
-            "avg": sum(latencies) / len(latencies),
+            "min": stats.minv,
+            "max": stats.maxv,
+            "avg": stats.mean,
+            "stddev": math.sqrt(stats.m2 / stats.count),
         }
 
 
 class DNSMonitor:
     """Monitor DNS resolution and caching."""
 
-    def __init__(self):
-        self._cache: Dict[str, Tuple[List[str], float]] = {}
-        self._cache_ttl = 300  # 5 minutes
+    def __init__(
+        self,
+        cache_ttl: float = 300,
+        negative_ttl: float = 60,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        cache_size: int = 1024,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            cache_ttl: Seconds to cache successful lookups
+            negative_ttl: Seconds to cache failed lookups
+            ttl_overrides: Per-hostname cache TTLs for successful lookups
+            cache_size: Maximum number of cached hostnames
+        """
+        # hostname -> (IP addresses, or None for a failed lookup; expiry time)
+        self._cache: _LRUCache = _LRUCache(
+            cache_size, expiry=lambda entry: entry[1])
+        self._cache_ttl = cache_ttl
+        self._negative_ttl = negative_ttl
+        self._ttl_overrides: Dict[str, float] = dict(ttl_overrides or {})
+        self._hits = 0
+        self._misses = 0
+        # Background refresh of entries close to expiry (stale-while-revalidate)
+        self._refresh_window = 0.2  # fraction of the TTL
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="DNSMonitor")
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
 
     def resolve(self, hostname: str) -> Optional[List[str]]:
         """Resolve a hostname to IP addresses.
@@ -240,71 +820,260 @@ class DNSMonitor:
         Returns:
             List of IP addresses or None if resolution failed
         """
-        try:
-            # Check cache first
-            if hostname in self._cache:
-                ips, timestamp = self._cache[hostname]
-                if time.time() - timestamp < self._cache_ttl:
-                    return ips
-
-            # Perform DNS lookup
-            ips = socket.gethostbyname_ex(hostname)[2]
-            self._cache[hostname] = (ips, time.time())
+        now = time.monotonic()
+        cached = self._cache.get(hostname)
+        if cached is not None and now < cached[1]:
+            self._hits += 1
+            ips, expiry = cached
+            if ips is not None and expiry - now < self._ttl(hostname) * self._refresh_window:
+                self._schedule_refresh(hostname)
             return ips
+
+        self._misses += 1
+        return self._lookup(hostname)
+
+    async def resolve_async(self, hostname: str) -> Optional[List[str]]:
+        """Resolve a hostname without blocking the running event loop.
+
+        Args:
+            hostname: Hostname to resolve
+
+        Returns:
+            List of IP addresses or None if resolution failed
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.resolve, hostname)
+
+    def _ttl(self, hostname: str) -> float:
+        """Get the cache TTL for successful lookups of a hostname."""
+        return self._ttl_overrides.get(hostname, self._cache_ttl)
+
+    def _lookup(self, hostname: str, negative: bool = True) -> Optional[List[str]]:
+        """Query the resolver and store the result in the cache.
+
+        Args:
+            hostname: Hostname to resolve
+            negative: Cache a failed lookup for the negative TTL; background
+                refreshes pass False so a still-valid answer is kept
+
+        Returns:
+            List of IP addresses or None if resolution failed
+        """
+        try:
+            # A single forward lookup for both IPv4 and IPv6 addresses;
+            # gethostbyname_ex is IPv4-only and also collects aliases.
+            infos = socket.getaddrinfo(
+                hostname, None, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM,
+                flags=socket.AI_NUMERICSERV,
+            )
+            ips = list(dict.fromkeys(info[4][0] for info in infos))
         except socket.gaierror as e:
             error(f"DNS resolution failed for {hostname}: {e}")
+            if negative:
+                self._cache[hostname] = (None, time.monotonic() + self._negative_ttl)
             return None
 
+        self._cache[hostname] = (ips, time.monotonic() + self._ttl(hostname))
+        return ips
+
+    def _schedule_refresh(self, hostname: str) -> None:
+        """Refresh a cached entry in the background unless already in progress."""
+        with self._refresh_lock:
+            if hostname in self._refreshing:
+                return
+            self._refreshing.add(hostname)
+        try:
+            self._executor.submit(self._refresh, hostname)
+        except RuntimeError:
+            # Executor shut down by close(); keep serving the cached answer
+            with self._refresh_lock:
+                self._refreshing.discard(hostname)
+
+    def _refresh(self, hostname: str) -> None:
+        """Background task re-resolving a hostname before its entry expires."""
+        try:
+            self._lookup(hostname, negative=False)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(hostname)
+
+    def close(self) -> None:
+        """Wait for pending background refreshes and stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
+    def flush(self) -> None:
+        """Clear all cached lookups, successful and failed."""
+        self._cache.clear()
+
     def get_cache_stats(self) -> Dict[str, int]:
         """Get DNS cache statistics.
         
         Returns:
             Dict containing cache size and hit/miss counts
         """
+        now = time.monotonic()
         return {
             "size": len(self._cache),
-            "entries": sum(1 for _, (_, timestamp) in self._cache.items()
-                          if time.time() - timestamp < self._cache_ttl),
+            "maxsize": self._cache.maxsize,
+            "entries": self._cache.live_count(now),
+            "hits": self._hits,
+            "misses": self._misses,
         }
 
 
+# Dotted OIDs of NameOID.COMMON_NAME and NameOID.ORGANIZATION_NAME
+_COMMON_NAME = "2.5.4.3"
+_ORGANIZATION_NAME = "2.5.4.10"
+
+
+class CertCacheEntry(NamedTuple):
+    """Parsed certificate fields cached by SSLCertMonitor."""
+
+    info: Dict
+    not_after: datetime
+    expires_at: float
+
+
+def _rdn_map(name: "x509.Name") -> Dict[str, str]:
+    """Map each dotted attribute OID in a subject or issuer to its first value."""
+    values: Dict[str, str] = {}
+    for attribute in name:
+        values.setdefault(attribute.oid.dotted_string, attribute.value)
+    return values
+
+
+def _peercert_name_map(name: Tuple) -> Dict[str, str]:
+    """Map each attribute in a `getpeercert()` subject or issuer to its first value."""
+    values: Dict[str, str] = {}
+    for rdn in name:
+        for attribute, value in rdn:
+            values.setdefault(attribute, value)
+    return values
+
+
+def _peercert_time(value: str) -> datetime:
+    """Parse a `getpeercert()` timestamp such as 'Jun  1 12:00:00 2025 GMT'."""
+    return datetime.fromtimestamp(ssl.cert_time_to_seconds(value), timezone.utc)
+
+
+def _days_until(moment: datetime) -> int:
+    """Get the number of whole days from now until a UTC datetime."""
+    return (moment - datetime.now(timezone.utc)).days
+
+
 class SSLCertMonitor:
     """Monitor SSL/TLS certificates."""
 
-    def __init__(self):
-        self._cache: Dict[str, Tuple[x509.Certificate, float]] = {}
+    def __init__(self, cache_size: int = 1024, verify: bool = False):
+        """Initialize the monitor.
+
+        Args:
+            cache_size: Maximum number of cached certificates
+            verify: Validate the certificate chain and hostname during the
+                handshake. Off by default so that expired, self-signed or
+                mismatched certificates can still be inspected.
+        """
+        # hostname -> CertCacheEntry
+        self._cache: _LRUCache = _LRUCache(
+            cache_size, expiry=lambda entry: entry.expires_at)
         self._cache_ttl = 3600  # 1 hour
+        self._verify = verify
+        self._ssl_context: Optional[ssl.SSLContext] = None
 
-    def check_certificate(self, hostname: str, port: int = 443) -> Optional[Dict]:
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        """Get the SSL context, creating it (and loading CA certs) on first use."""
+        if self._ssl_context is None:
+            context = ssl.create_default_context()
+            if not self._verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._ssl_context = context
+        return self._ssl_context
+
+    def check_certificate(
+        self, hostname: str, port: int = 443, fast: bool = True
+    ) -> Optional[Dict]:
         """Check SSL/TLS certificate for a host.
         
         Args:
             hostname: Host to check certificate for
             port: Port to connect to
+            fast: Use the fields OpenSSL already parsed during the handshake
+                instead of decoding the DER certificate again. Only possible
+                when the monitor verifies certificates; otherwise the
+                certificate is always decoded with cryptography.
             
         Returns:
             Dict containing certificate information or None if check failed
         """
         try:
-            # Check cache first
-            if hostname in self._cache:
-                cert, timestamp = self._cache[hostname]
-                if time.time() - timestamp < self._cache_ttl:
-                    return self._get_cert_info(cert)
+            # Check cache first; only the expiry countdown changes over time.
+            # Callers get their own copy so mutating it cannot alter the cache;
+            # subject and issuer are the only mutable values.
+            now = time.monotonic()
+            entry = self._cache.get(hostname)
+            if entry is not None and now < entry.expires_at:
+                info = entry.info
+                return {
+                    **info,
+                    "subject": dict(info["subject"]),
+                    "issuer": dict(info["issuer"]),
+                    "days_until_expiry": _days_until(entry.not_after),
+                }
 
             # Fetch certificate
-            context = ssl.create_default_context()
+            context = self._get_ssl_context()
+            # getpeercert() only returns fields for a verified certificate
+            fast = fast and context.verify_mode != ssl.CERT_NONE
             with socket.create_connection((hostname, port)) as sock:
                 with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cert = ssock.getpeercert(binary_form=True)
-                    x509_cert = x509.load_der_x509_certificate(cert, default_backend())
-                    self._cache[hostname] = (x509_cert, time.time())
-                    return self._get_cert_info(x509_cert)
+                    cert = ssock.getpeercert(binary_form=not fast)
+            if fast:
+                info = self._get_peercert_info(cert)
+                not_after = _peercert_time(cert["notAfter"])
+            else:
+                from cryptography import x509
+
+                x509_cert = x509.load_der_x509_certificate(cert)
+                info = self._get_cert_info(x509_cert)
+                not_after = x509_cert.not_valid_after_utc
+            self._cache[hostname] = CertCacheEntry(
+                info, not_after, now + self._cache_ttl
+            )
+            return {
+                **info,
+                "subject": dict(info["subject"]),
+                "issuer": dict(info["issuer"]),
+            }
         except Exception as e:
             error(f"SSL certificate check failed for {hostname}: {e}")
             return None
 
-    def _get_cert_info(self, cert: x509.Certificate) -> Dict:
+    def check_certificates(
+        self, hostnames: List[str], port: int = 443
+    ) -> Dict[str, Optional[Dict]]:
+        """Check SSL/TLS certificates for several hosts concurrently.
+
+        Args:
+            hostnames: Hosts to check certificates for
+            port: Port to connect to
+
+        Returns:
+            Dict mapping each hostname to its certificate information, or None if the check failed
+        """
+        if not hostnames:
+            return {}
+        results: Dict[str, Optional[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=min(32, len(hostnames))) as executor:
+            futures = {
+                executor.submit(self.check_certificate, hostname, port): hostname
+                for hostname in hostnames
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def _get_cert_info(self, cert: "x509.Certificate") -> Dict:
         """Extract information from an X.509 certificate.
         
         Args:
@@ -313,44 +1082,63 @@ class SSLCertMonitor:
         Returns:
             Dict containing certificate information
         """
-        subject = cert.subject
-        issuer = cert.issuer
-        
-        def get_attr_value(attrs, oid, default: str = "Unknown") -> str:
-            """Safely get attribute value from certificate."""
-            try:
-                return attrs.get_attributes_for_oid(oid)[0].value
-            except (IndexError, AttributeError):
-                return default
-
-        # Calculate days until expiration
-        now = datetime.now()
-        days_until_expiry = (cert.not_valid_after_utc - now).days
+        subject = _rdn_map(cert.subject)
+        issuer = _rdn_map(cert.issuer)
 
         return {
             "subject": {
-                "common_name": get_attr_value(subject, NameOID.COMMON_NAME),
-                "organization": get_attr_value(subject, NameOID.ORGANIZATION_NAME),
+                "common_name": subject.get(_COMMON_NAME, "Unknown"),
+                "organization": subject.get(_ORGANIZATION_NAME, "Unknown"),
             },
             "issuer": {
-                "common_name": get_attr_value(issuer, NameOID.COMMON_NAME),
-                "organization": get_attr_value(issuer, NameOID.ORGANIZATION_NAME),
+                "common_name": issuer.get(_COMMON_NAME, "Unknown"),
+                "organization": issuer.get(_ORGANIZATION_NAME, "Unknown"),
             },
             "not_before": cert.not_valid_before_utc.isoformat(),
             "not_after": cert.not_valid_after_utc.isoformat(),
-            "days_until_expiry": days_until_expiry,
+            "days_until_expiry": _days_until(cert.not_valid_after_utc),
             "serial_number": cert.serial_number,
             "version": cert.version.name,
         }
 
+    def _get_peercert_info(self, cert: Dict) -> Dict:
+        """Extract information from a certificate dict returned by `getpeercert()`.
+
+        Args:
+            cert: Decoded certificate fields
+
+        Returns:
+            Dict containing certificate information, as from _get_cert_info
+        """
+        subject = _peercert_name_map(cert.get("subject", ()))
+        issuer = _peercert_name_map(cert.get("issuer", ()))
+        not_after = _peercert_time(cert["notAfter"])
+
+        return {
+            "subject": {
+                "common_name": subject.get("commonName", "Unknown"),
+                "organization": subject.get("organizationName", "Unknown"),
+            },
+            "issuer": {
+                "common_name": issuer.get("commonName", "Unknown"),
+                "organization": issuer.get("organizationName", "Unknown"),
+            },
+            "not_before": _peercert_time(cert["notBefore"]).isoformat(),
+            "not_after": not_after.isoformat(),
+            "days_until_expiry": _days_until(not_after),
+            "serial_number": int(cert["serialNumber"], 16),
+            "version": f"v{cert['version']}",
+        }
+
     def get_cache_stats(self) -> Dict[str, int]:
         """Get SSL certificate cache statistics.
         
         Returns:
             Dict containing cache size and hit/miss counts
         """
+        now = time.monotonic()
         return {
             "size": len(self._cache),
-            "entries": sum(1 for _, (_, timestamp) in self._cache.items()
-                           if time.time() - timestamp < self._cache_ttl),
+            "maxsize": self._cache.maxsize,
+            "entries": self._cache.live_count(now),
         }
\ No newline at end of file
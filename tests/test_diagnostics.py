@@ -4,10 +4,17 @@
 import unittest
 from unittest.mock import patch
 import json
+import logging
+import os
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 from io import StringIO
 
-from diagnostics.__main__ import main
+from diagnostics import diagnostics as diag
+from diagnostics.__main__ import main, create_parser, _sniff_subcommand, COMMANDS
 
 
 class TestDiagnostics(unittest.TestCase):
@@ -92,6 +99,14 @@ class TestDiagnostics(unittest.TestCase):
             main()
             mock_help.assert_called_once()
 
+    def test_usage_error_lists_all_commands(self):
+        """Test that help after a usage error is not limited to the sniffed command."""
+        sys.argv = ['diagnostics', 'metrics', '--bogus']
+        self.assertEqual(main(), 2)
+        output = self.stdout.getvalue()
+        self.assertIn("metrics", output)
+        self.assertIn("network", output)
+
     def test_no_command(self):
         """Test handling of no command provided."""
         sys.argv = ['diagnostics']
@@ -116,6 +131,252 @@ class TestDiagnostics(unittest.TestCase):
             mock_network_main.assert_called_once()
 
 
+class TestParserConstruction(unittest.TestCase):
+    """Test cases for subcommand sniffing and partial parser construction."""
+
+    def test_sniff_subcommand(self):
+        """Test that the first positional token is returned when known."""
+        self.assertEqual(_sniff_subcommand(['metrics', '--json'], COMMANDS), 'metrics')
+        self.assertEqual(_sniff_subcommand(['network', 'dns', 'x'], COMMANDS), 'network')
+        self.assertIsNone(_sniff_subcommand([], COMMANDS))
+        self.assertIsNone(_sniff_subcommand(['bogus'], COMMANDS))
+        self.assertIsNone(_sniff_subcommand(['metrics', '--help'], COMMANDS))
+
+    def test_cli_import_skips_network_stack(self):
+        """Test that importing the CLI does not load the network implementation."""
+        code = (
+            "import sys, diagnostics.__main__; "
+            "print('diagnostics.network.network' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_partial_parser(self):
+        """Test that only the selected branch is built."""
+        parser, command_parsers = create_parser('network', 'dns')
+        self.assertEqual(list(command_parsers), ['network'])
+        args = parser.parse_args(['network', 'dns', 'example.com'])
+        self.assertEqual(args.network_command, 'dns')
+        self.assertEqual(args.hostname, 'example.com')
+        with self.assertRaises(SystemExit):
+            parser.parse_args(['metrics'])
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Metrics helpers."""
+
+    def test_process_is_cached(self):
+        """Test that the psutil.Process handle is created only once."""
+        with patch.object(diag, '_proc', None), \
+             patch('psutil.Process', wraps=diag.psutil.Process) as mock_process:
+            diag.Metrics.memory_usage()
+            diag.Metrics.thread_count()
+            diag.Metrics.uptime()
+            mock_process.assert_called_once()
+
+    def test_cpu_percent_reuses_recent_sample(self):
+        """Test that rapid cpu_percent calls reuse the last reading."""
+        with patch.object(diag, '_cpu_sample', None), \
+             patch('psutil.cpu_percent', side_effect=[25.0, 75.0]) as mock_cpu:
+            self.assertEqual(diag.Metrics.cpu_percent(), 25.0)
+            self.assertEqual(diag.Metrics.cpu_percent(), 25.0)
+            mock_cpu.assert_called_once()
+
+
+class TestLogging(unittest.TestCase):
+    """Test cases for the logging helpers."""
+
+    def setUp(self):
+        """Restore the logger level after each test."""
+        self.addCleanup(diag.logger.setLevel, diag.logger.level)
+
+    def test_refresh_project_root(self):
+        """Test that caller paths follow the refreshed project root."""
+        original_cwd = os.getcwd()
+        target = os.path.join(original_cwd, 'pkg', 'mod.py')
+        self.assertEqual(diag._relative_caller_path(target), 'pkg/mod.py')
+        outside = os.path.join(os.path.dirname(original_cwd), 'elsewhere.py')
+        self.assertEqual(diag._relative_caller_path(outside), '../elsewhere.py')
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                os.chdir(tmp)
+                diag.refresh_project_root()
+                self.assertEqual(
+                    diag._relative_caller_path(os.path.join(tmp, 'mod.py')), 'mod.py'
+                )
+            finally:
+                os.chdir(original_cwd)
+                diag.refresh_project_root()
+
+    def test_log_skips_disabled_levels(self):
+        """Test that records below the logger level never look up their caller."""
+        diag.logger.setLevel(logging.ERROR)
+        with patch.object(diag.logger, 'findCaller') as mock_find_caller:
+            diag.debug("ignored")
+            mock_find_caller.assert_not_called()
+
+    def test_log_args_merged_lazily(self):
+        """Test that %-style arguments are only merged into emitted records."""
+        class Payload:
+            def __str__(self):
+                raise AssertionError("argument was formatted")
+
+        diag.logger.setLevel(logging.INFO)
+        with patch.object(diag.logger, 'handle') as mock_handle:
+            diag.debug("ignored %s", Payload())
+            diag.info("took %.1fs for %s", 1.25, "example.com")
+        record = mock_handle.call_args[0][0]
+        self.assertEqual(record.getMessage(), "took 1.2s for example.com")
+
+    def test_log_function_call_skips_formatting_when_disabled(self):
+        """Test that arguments are not formatted when debug logging is off."""
+        class Payload:
+            def __repr__(self):
+                raise AssertionError("argument was formatted")
+
+        @diag.log_function_call
+        def identity(value):
+            return value
+
+        diag.logger.setLevel(logging.ERROR)
+        payload = Payload()
+        self.assertIs(identity(payload), payload)
+
+    def test_run_debug_functions_writes_into_log_dir(self):
+        """Test that debug function output is appended inside the log directory."""
+        def report():
+            return "state"
+
+        def other_report():
+            return "more state"
+
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(diag, 'debug_functions', {}):
+            try:
+                diag.register_debug_function(report)
+                diag.register_debug_function(other_report)
+                diag.set_log_directory(tmp)
+                diag.run_debug_functions()
+                diag.run_debug_functions()
+                self.assertEqual(os.path.dirname(diag.current_log_dir()), tmp)
+                # Output is grouped by the first component of the qualname
+                log_file = os.path.join(diag.current_log_dir(), 'TestLogging.log')
+                with open(log_file, encoding='utf-8') as f:
+                    content = f.read()
+                self.assertEqual(content.count("more state"), 2)
+                self.assertEqual(content.count("*" * 80), 3)
+            finally:
+                diag.set_log_directory(None)
+
+    def test_cleanup_logs_keeps_latest(self):
+        """Test that cleanup_logs removes only the oldest log directories."""
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(diag, '_log_directory', tmp), \
+             patch.object(diag, '_max_logs', 2):
+            names = ['2024-01-01_00-00-00', '2024-01-02_00-00-00', '2024-01-03_00-00-00']
+            for name in names:
+                os.makedirs(os.path.join(tmp, name, 'nested'))
+            diag.cleanup_logs()
+            self.assertEqual(sorted(os.listdir(tmp)), names[1:])
+
+            diag._max_logs = 5
+            diag.cleanup_logs()
+            self.assertEqual(sorted(os.listdir(tmp)), names[1:])
+
+    def test_concurrent_start_creates_one_listener(self):
+        """Test that racing first log calls start a single listener."""
+        diag._stop_listener()
+        self.addCleanup(diag._stop_listener)
+        started = []
+
+        class SlowListener:
+            def __init__(self, *args, **kwargs):
+                time.sleep(0.01)
+                started.append(self)
+
+            def start(self):
+                pass
+
+            def stop(self):
+                pass
+
+        with patch.object(diag.logging.handlers, 'QueueListener', SlowListener):
+            threads = [threading.Thread(target=diag._start_listener) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(started), 1)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires os.fork")
+    def test_fork_resets_listener(self):
+        """Test that a forked child drops the parent's listener and queue."""
+        diag._start_listener()
+        parent_queue = diag._log_queue
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            fresh = (diag._listener is None
+                     and diag._log_queue is not parent_queue
+                     and diag._queue_handler.queue is diag._log_queue)
+            os.write(write_fd, b'1' if fresh else b'0')
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as reader:
+            result = reader.read()
+        os.waitpid(pid, 0)
+        self.assertEqual(result, b'1')
+        self.assertIsNotNone(diag._listener)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires os.fork")
+    def test_fork_restarts_flush_thread(self):
+        """Test that a forked child flushes its own buffered records to disk."""
+        diag.logger.setLevel(logging.INFO)
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(diag, '_flush_interval', 0.05):
+            try:
+                diag.set_log_directory(tmp)
+                log_file = os.path.join(diag.current_log_dir(), 'debug.log')
+                read_fd, write_fd = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(read_fd)
+                    alive = diag._flush_thread.is_alive()
+                    diag.info("record from the child")
+                    written = False
+                    deadline = time.monotonic() + 2
+                    while not written and time.monotonic() < deadline:
+                        time.sleep(0.05)
+                        with open(log_file, encoding='utf-8') as f:
+                            written = "record from the child" in f.read()
+                    os.write(write_fd, b'1' if alive and written else b'0')
+                    os._exit(0)
+                os.close(write_fd)
+                with os.fdopen(read_fd, 'rb') as reader:
+                    result = reader.read()
+                os.waitpid(pid, 0)
+                self.assertEqual(result, b'1')
+            finally:
+                diag.set_log_directory(None)
+
+    def test_flush_thread_exits_without_file_logging(self):
+        """Test that the flush thread stops once file logging is disabled."""
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(diag, '_flush_interval', 0.05):
+            try:
+                diag.set_log_directory(tmp)
+                thread = diag._flush_thread
+                self.assertTrue(thread.is_alive())
+            finally:
+                diag.set_log_directory(None)
+            thread.join(timeout=2)
+            self.assertFalse(thread.is_alive())
+            self.assertIsNone(diag._flush_thread)
+
+
 class TestVersion(unittest.TestCase):
     """Test cases for version information."""
 
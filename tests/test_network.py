@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 """Test suite for the network diagnostics module."""
 
+import copy
+import json
 import unittest
-from unittest.mock import patch, MagicMock
+from collections import deque, namedtuple
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch, AsyncMock, MagicMock
 import socket
-import ssl
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from diagnostics import __version__
 
+from diagnostics.network import network as network_mod
 from diagnostics.network.network import (
+    _conn_cache,
     NetworkMetrics,
+    IncrementalSampler,
     ConnectionMonitor,
     LatencyMonitor,
     DNSMonitor,
@@ -17,13 +25,109 @@ from diagnostics.network.network import (
 )
 
 
+def addrinfo(*ips):
+    """Build a socket.getaddrinfo() result for the given addresses."""
+    return [
+        (socket.AF_INET6 if ':' in ip else socket.AF_INET, socket.SOCK_STREAM,
+         socket.IPPROTO_TCP, '', (ip, 0))
+        for ip in ips
+    ]
+
+
+@contextmanager
+def ssl_handshake_patches(peercert=b'cert_data'):
+    """Patch the TLS connection so that the peer presents `peercert`.
+
+    Yields a namespace with the SSL context, the TLS socket and the patched
+    cryptography loader. The context starts out verifying, like the one from
+    ssl.create_default_context(). Only the attributes check_certificate uses
+    are present; anything else raises.
+    """
+    import ssl
+
+    ssock = MagicMock(spec=['getpeercert'])
+    ssock.getpeercert.return_value = peercert
+    wrapped = MagicMock(spec=['__enter__', '__exit__'])
+    wrapped.__enter__.return_value = ssock
+    context = MagicMock(spec=['wrap_socket'])
+    context.wrap_socket.return_value = wrapped
+    context.verify_mode = ssl.CERT_REQUIRED
+    context.check_hostname = True
+    with patch('ssl.create_default_context', return_value=context), \
+         patch('socket.create_connection',
+               return_value=MagicMock(spec=['__enter__', '__exit__'])), \
+         patch('cryptography.x509.load_der_x509_certificate') as mock_load:
+        yield SimpleNamespace(context=context, ssock=ssock, load=mock_load)
+
+
+# Same shape as the namedtuples returned by psutil.net_io_counters(pernic=True)
+snetio = namedtuple(
+    'snetio',
+    ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+     'errin', 'errout', 'dropin', 'dropout'],
+)
+
+
+class LazyMonitorMixin:
+    """Provide a fresh `self.monitor` per test, built only if the test uses it.
+
+    Many tests construct a monitor with their own settings; they no longer pay
+    for a default one in setUp. Monitors with a close() method are closed at
+    cleanup.
+    """
+
+    monitor_class: type
+
+    @property
+    def monitor(self):
+        monitor = self.__dict__.get('_monitor')
+        if monitor is None:
+            monitor = self._monitor = self.monitor_class()
+            if hasattr(monitor, 'close'):
+                self.addCleanup(monitor.close)
+        return monitor
+
+
+class TestPackageExports(unittest.TestCase):
+    """Test cases for the lazily-loaded network package exports."""
+
+    def test_lazy_exports(self):
+        """Test that package-level names resolve to the implementation classes."""
+        import diagnostics.network as network_pkg
+        for name in network_pkg.__all__:
+            self.assertIs(getattr(network_pkg, name), globals()[name])
+
+    def test_import_skips_cryptography(self):
+        """Test that loading the implementation does not import cryptography."""
+        import subprocess
+        import sys
+        code = (
+            "import sys, diagnostics.network.network; "
+            "print('cryptography' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_unknown_attribute(self):
+        """Test that unknown attributes still raise AttributeError."""
+        import diagnostics.network as network_pkg
+        with self.assertRaises(AttributeError):
+            network_pkg.NotAMonitor
+
+
 class TestNetworkMetrics(unittest.TestCase):
     """Test cases for NetworkMetrics class."""
 
+    def setUp(self):
+        """Set up test fixtures."""
+        _conn_cache.clear()
+
     def test_get_interface_stats(self):
         """Test getting network interface statistics."""
         mock_stats = {
-            'eth0': MagicMock(
+            'eth0': snetio(
                 bytes_sent=1000,
                 bytes_recv=2000,
                 packets_sent=10,
@@ -33,7 +137,7 @@ class TestNetworkMetrics(unittest.TestCase):
                 dropin=0,
                 dropout=0,
             ),
-            'lo': MagicMock(
+            'lo': snetio(
                 bytes_sent=500,
                 bytes_recv=500,
                 packets_sent=5,
@@ -45,49 +149,68 @@ class TestNetworkMetrics(unittest.TestCase):
             ),
         }
 
-        with patch('psutil.net_if_stats', return_value=mock_stats):
+        with patch('psutil.net_io_counters', return_value=mock_stats) as mock_counters:
             stats = NetworkMetrics.get_interface_stats()
-            
-            # Check eth0 stats
-            self.assertEqual(stats['eth0']['bytes_sent'], 1000)
-            self.assertEqual(stats['eth0']['bytes_recv'], 2000)
-            self.assertEqual(stats['eth0']['packets_sent'], 10)
-            self.assertEqual(stats['eth0']['packets_recv'], 20)
-            
-            # Check lo stats
-            self.assertEqual(stats['lo']['bytes_sent'], 500)
-            self.assertEqual(stats['lo']['bytes_recv'], 500)
-            self.assertEqual(stats['lo']['packets_sent'], 5)
-            self.assertEqual(stats['lo']['packets_recv'], 5)
-
-    def test_get_interface_stats_missing_attrs(self):
-        """Test handling of interfaces with missing attributes."""
-        # Create a mock that raises AttributeError for all attribute access
-        class MockInterface:
-            def __getattr__(self, name):
-                raise AttributeError()
-        
-        mock_stats = {
-            'eth0': MockInterface(),
-        }
+            mock_counters.assert_called_once_with(pernic=True, nowrap=True)
 
-        with patch('psutil.net_if_stats', return_value=mock_stats):
+        zero_errors = {'errin': 0, 'errout': 0, 'dropin': 0, 'dropout': 0}
+        self.assertEqual(stats, {
+            'eth0': {'bytes_sent': 1000, 'bytes_recv': 2000,
+                     'packets_sent': 10, 'packets_recv': 20, **zero_errors},
+            'lo': {'bytes_sent': 500, 'bytes_recv': 500,
+                   'packets_sent': 5, 'packets_recv': 5, **zero_errors},
+        })
+
+    def test_get_interface_stats_fields(self):
+        """Test that every counter field is reported for each interface."""
+        mock_stats = {'eth0': snetio(0, 0, 0, 0, 0, 0, 0, 0)}
+
+        with patch('psutil.net_io_counters', return_value=mock_stats):
             stats = NetworkMetrics.get_interface_stats()
             
-            # Check that missing attributes default to 0
-            self.assertEqual(stats['eth0']['bytes_sent'], 0)
-            self.assertEqual(stats['eth0']['bytes_recv'], 0)
-            self.assertEqual(stats['eth0']['packets_sent'], 0)
-            self.assertEqual(stats['eth0']['packets_recv'], 0)
-            self.assertEqual(stats['eth0']['errin'], 0)
-            self.assertEqual(stats['eth0']['errout'], 0)
-            self.assertEqual(stats['eth0']['dropin'], 0)
-            self.assertEqual(stats['eth0']['dropout'], 0)
+            self.assertEqual(
+                set(stats['eth0']),
+                {'bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                 'errin', 'errout', 'dropin', 'dropout'},
+            )
+
+    def test_incremental_sampler(self):
+        """Test throughput rates computed from consecutive snapshots."""
+        first = {'eth0': snetio(1000, 2000, 10, 20, 0, 0, 0, 0)}
+        second = {
+            'eth0': snetio(3000, 2000, 30, 20, 0, 0, 0, 0),
+            'wlan0': snetio(5, 5, 1, 1, 0, 0, 0, 0),
+        }
+        sampler = IncrementalSampler()
+        with patch('psutil.net_io_counters', side_effect=[first, second]), \
+             patch('time.monotonic', side_effect=[10.0, 12.0]):
+            self.assertEqual(sampler.sample(), {})
+            rates = sampler.sample()
+
+        self.assertEqual(rates, {
+            'eth0': {
+                'bytes_sent_per_sec': 1000.0,
+                'bytes_recv_per_sec': 0.0,
+                'packets_sent_per_sec': 10.0,
+                'packets_recv_per_sec': 0.0,
+            },
+        })
+
+    def test_incremental_sampler_counter_wrap(self):
+        """Test that a wrapped 64-bit counter still yields a positive delta."""
+        first = {'eth0': snetio(2**64 - 100, 0, 0, 0, 0, 0, 0, 0)}
+        second = {'eth0': snetio(100, 0, 0, 0, 0, 0, 0, 0)}
+        sampler = IncrementalSampler()
+        with patch('psutil.net_io_counters', side_effect=[first, second]), \
+             patch('time.monotonic', side_effect=[0.0, 1.0]):
+            sampler.sample()
+            rates = sampler.sample()
+        self.assertEqual(rates['eth0']['bytes_sent_per_sec'], 200.0)
 
     def test_get_connections(self):
         """Test getting network connections."""
         mock_connections = [
-            MagicMock(
+            SimpleNamespace(
                 fd=1,
                 family=socket.AF_INET,
                 type=socket.SOCK_STREAM,
@@ -104,13 +227,81 @@ class TestNetworkMetrics(unittest.TestCase):
             # Check connection details
             self.assertEqual(len(connections), 1)
             conn = connections[0]
-            self.assertEqual(conn['fd'], 1)
-            self.assertEqual(conn['family'], socket.AF_INET)
-            self.assertEqual(conn['type'], socket.SOCK_STREAM)
-            self.assertEqual(conn['local_addr'], ('127.0.0.1', 8080))
-            self.assertEqual(conn['remote_addr'], ('127.0.0.1', 12345))
-            self.assertEqual(conn['status'], 'ESTABLISHED')
-            self.assertEqual(conn['pid'], 1234)
+            self.assertEqual(conn.fd, 1)
+            self.assertEqual(conn.family, socket.AF_INET)
+            self.assertEqual(conn.type, socket.SOCK_STREAM)
+            self.assertEqual(conn.local_addr, ('127.0.0.1', 8080))
+            self.assertEqual(conn.remote_addr, ('127.0.0.1', 12345))
+            self.assertEqual(conn.status, 'ESTABLISHED')
+            self.assertEqual(conn.pid, 1234)
+
+    def test_get_connection_columns(self):
+        """Test getting connections as parallel columns."""
+        mock_connections = [
+            SimpleNamespace(fd=3, family=socket.AF_INET, type=socket.SOCK_STREAM,
+                            laddr=('0.0.0.0', 80), raddr=(), status='LISTEN', pid=None),
+            SimpleNamespace(fd=4, family=socket.AF_INET6, type=socket.SOCK_STREAM,
+                            laddr=('::1', 8080), raddr=('::1', 5000),
+                            status='ESTABLISHED', pid=1234),
+        ]
+
+        with patch('psutil.net_connections', return_value=mock_connections):
+            columns = NetworkMetrics.get_connection_columns()
+
+        self.assertEqual(list(columns['fd']), [3, 4])
+        self.assertEqual(list(columns['family']), [socket.AF_INET, socket.AF_INET6])
+        self.assertEqual(columns['status'], ['LISTEN', 'ESTABLISHED'])
+        self.assertEqual(columns['remote_addr'], [(), ('::1', 5000)])
+        self.assertEqual(list(columns['pid']), [-1, 1234])
+
+    def test_oneshot_reuses_reads(self):
+        """Test that psutil is read once per oneshot block."""
+        mock_stats = {'eth0': snetio(1, 2, 3, 4, 0, 0, 0, 0)}
+        with patch('psutil.net_io_counters', return_value=mock_stats) as mock_counters:
+            with NetworkMetrics.oneshot():
+                NetworkMetrics.get_interface_stats()
+                with NetworkMetrics.oneshot():
+                    NetworkMetrics.get_interface_stats()
+                NetworkMetrics.get_interface_stats()
+            mock_counters.assert_called_once()
+            NetworkMetrics.get_interface_stats()
+            self.assertEqual(mock_counters.call_count, 2)
+
+    def test_snapshot(self):
+        """Test that consumers use a snapshot instead of querying psutil."""
+        mock_connections = [
+            SimpleNamespace(fd=3, family=socket.AF_INET, type=socket.SOCK_STREAM,
+                            laddr=('0.0.0.0', 80), raddr=(), status='LISTEN', pid=1),
+        ]
+        with patch('psutil.net_io_counters',
+                   return_value={'eth0': snetio(1, 2, 3, 4, 0, 0, 0, 0)}), \
+             patch('psutil.net_if_stats', return_value={'eth0': SimpleNamespace(isup=True)}), \
+             patch('psutil.net_connections', return_value=mock_connections):
+            snapshot = NetworkMetrics.snapshot()
+
+        with patch('psutil.net_io_counters') as mock_counters, \
+             patch('psutil.net_connections') as mock_scan:
+            stats = NetworkMetrics.get_interface_stats(snapshot)
+            connections = NetworkMetrics.get_connections(snapshot=snapshot)
+            monitor = ConnectionMonitor()
+            monitor.update(snapshot)
+            mock_counters.assert_not_called()
+            mock_scan.assert_not_called()
+
+        self.assertEqual(stats['eth0']['bytes_recv'], 2)
+        self.assertEqual(connections[0].status, 'LISTEN')
+        self.assertEqual(monitor.get_connection_summary(), {'LISTEN': 1})
+        self.assertEqual(list(snapshot.if_stats), ['eth0'])
+
+    def test_get_connections_cached(self):
+        """Test that connection scans are shared within the cache TTL."""
+        with patch('psutil.net_connections', return_value=[]) as mock_scan:
+            NetworkMetrics.get_connections()
+            ConnectionMonitor().update()
+            mock_scan.assert_called_once_with(kind='inet')
+
+            NetworkMetrics.get_connections(kind='tcp')
+            self.assertEqual(mock_scan.call_count, 2)
 
 
 class TestConnectionMonitor(unittest.TestCase):
@@ -118,18 +309,19 @@ class TestConnectionMonitor(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        _conn_cache.clear()
         self.monitor = ConnectionMonitor()
 
     def test_update(self):
         """Test updating connection statistics."""
         mock_connections = [
-            MagicMock(
+            SimpleNamespace(
                 status='ESTABLISHED',
                 laddr=('127.0.0.1', 8080),
                 raddr=('127.0.0.1', 12345),
                 pid=1234,
             ),
-            MagicMock(
+            SimpleNamespace(
                 status='LISTEN',
                 laddr=('0.0.0.0', 80),
                 raddr=None,
@@ -152,202 +344,467 @@ class TestConnectionMonitor(unittest.TestCase):
             self.assertEqual(established[0]['remote'], ('127.0.0.1', 12345))
             self.assertEqual(established[0]['pid'], 1234)
 
+            # Unknown statuses have no details and don't appear in the summary
+            self.assertEqual(self.monitor.get_connections_by_status('CLOSE_WAIT'), [])
+            self.assertEqual(self.monitor.get_connection_summary(),
+                             {'ESTABLISHED': 1, 'LISTEN': 1})
 
-class TestLatencyMonitor(unittest.TestCase):
+
+class TestLatencyMonitor(LazyMonitorMixin, unittest.TestCase):
     """Test cases for LatencyMonitor class."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.monitor = LatencyMonitor()
+    monitor_class = LatencyMonitor
 
     def test_measure_latency_success(self):
         """Test successful latency measurement."""
-        with patch('socket.socket') as mock_socket, \
-             patch('time.time') as mock_time:
-            # Set up the mock socket properly
+        # Clock readings before and after the connection: 100ms latency
+        monitor = LatencyMonitor(clock=iter([0.0, 0.1]).__next__)
+        with patch('socket.create_connection') as mock_connect, \
+             patch.object(network_mod, '_tcp_info_rtt', return_value=None):
             mock_sock = MagicMock()
-            mock_socket.return_value = mock_sock
-            
-            # Simulate time passing during the connection
-            mock_time.side_effect = [0.0, 0.1]  # 100ms latency
-            
-            latency = self.monitor.measure_latency('google.com', port=80)
+            mock_connect.return_value = mock_sock
+
+            latency = monitor.measure_latency('google.com', port=80)
             self.assertIsNotNone(latency)
             self.assertGreater(latency, 0)
             self.assertEqual(latency, 0.1)  # Should be exactly 100ms
-            mock_sock.connect.assert_called_once_with(('google.com', 80))
+            mock_connect.assert_called_once_with(('google.com', 80), timeout=1.0)
+            mock_sock.close.assert_called_once()
+
+    def test_default_clock_is_monotonic(self):
+        """Test that latencies and intervals use a clock that never goes back."""
+        self.assertIs(self.monitor._clock, time.monotonic)
+
+    def test_measure_latency_prefers_kernel_rtt(self):
+        """Test that the TCP_INFO round-trip time is used when available."""
+        with patch('socket.create_connection') as mock_connect, \
+             patch.object(network_mod, '_tcp_info_rtt', return_value=0.02):
+            mock_sock = MagicMock()
+            mock_connect.return_value = mock_sock
+
+            latency = self.monitor.measure_latency('google.com', port=80)
+            self.assertEqual(latency, 0.02)
+            mock_sock.setsockopt.assert_called_once()
             mock_sock.close.assert_called_once()
 
     def test_measure_latency_timeout(self):
         """Test latency measurement timeout."""
-        with patch('socket.socket') as mock_socket:
-            # Set up the mock socket properly
-            mock_sock = MagicMock()
-            mock_socket.return_value = mock_sock
-            mock_sock.connect.side_effect = socket.timeout()
-            
+        with patch('socket.create_connection', side_effect=socket.timeout()):
             latency = self.monitor.measure_latency('google.com', port=80)
             self.assertIsNone(latency)
 
-    def test_track_latency_storage(self):
-        """Test that latency measurements are stored correctly."""
-        # Directly add a measurement to test storage
-        self.monitor._latencies['google.com'] = [0.1]
-        
-        # Verify storage
-        self.assertIn('google.com', self.monitor._latencies)
-        self.assertEqual(len(self.monitor._latencies['google.com']), 1)
-        self.assertEqual(self.monitor._latencies['google.com'][0], 0.1)
-        
-        # Test multiple measurements
-        self.monitor._latencies['google.com'].append(0.2)
-        self.assertEqual(len(self.monitor._latencies['google.com']), 2)
-        self.assertEqual(self.monitor._latencies['google.com'][1], 0.2)
+    def test_measure_many(self):
+        """Test measuring several targets concurrently."""
+        latencies = {('a.example', 80): 0.1, ('b.example', 443): None}
+        with patch.object(self.monitor, 'measure_latency',
+                          side_effect=lambda host, port, timeout: latencies[(host, port)]):
+            results = self.monitor.measure_many(list(latencies))
+        self.assertEqual(results, latencies)
+
+    def test_measure_many_async(self):
+        """Test measuring several targets from an event loop."""
+        import asyncio
+
+        async def fake_measure(host, port, timeout):
+            return None if host == 'down.example' else 0.1
+
+        targets = [('up.example', 80), ('down.example', 80)]
+        with patch.object(self.monitor, 'measure_latency_async', side_effect=fake_measure):
+            results = asyncio.run(self.monitor.measure_many_async(targets))
+        self.assertEqual(results, {('up.example', 80): 0.1, ('down.example', 80): None})
+
+    def test_measure_latency_async(self):
+        """Test that the async probe reports the kernel RTT and awaits the close."""
+        import asyncio
+
+        writer = MagicMock()
+        writer.wait_closed = AsyncMock()
+        with patch('asyncio.open_connection', AsyncMock(return_value=(None, writer))), \
+             patch.object(network_mod, '_tcp_info_rtt', return_value=0.02):
+            latency = asyncio.run(self.monitor.measure_latency_async('google.com'))
+        self.assertEqual(latency, 0.02)
+        writer.get_extra_info.assert_called_once_with('socket')
+        writer.close.assert_called_once()
+        writer.wait_closed.assert_awaited_once()
+
+    def test_measure_many_nonblocking(self):
+        """Test concurrent probes on one selector against loopback."""
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        open_port = listener.getsockname()[1]
+        closed_port = closed.getsockname()[1]
+        closed.close()
+        targets = [('127.0.0.1', open_port), ('127.0.0.1', closed_port)]
+        try:
+            with patch.object(network_mod, 'warning') as mock_warning:
+                results = self.monitor.measure_many_nonblocking(targets, timeout=2.0)
+        finally:
+            listener.close()
+
+        self.assertEqual(set(results), set(targets))
+        self.assertIsInstance(results[('127.0.0.1', open_port)], float)
+        self.assertIsNone(results[('127.0.0.1', closed_port)])
+        mock_warning.assert_called_once()
+
+    def test_measure_many_nonblocking_wouldblock(self):
+        """Test that a connect reporting WSAEWOULDBLOCK, as on Windows, is awaited."""
+        class WindowsSocket(socket.socket):
+            def connect(self, address):
+                try:
+                    super().connect(address)
+                except BlockingIOError:
+                    pass
+                raise BlockingIOError(10035, "A non-blocking socket operation "
+                                             "could not be completed immediately")
+
+            def connect_ex(self, address):
+                try:
+                    self.connect(address)
+                except OSError as e:
+                    return e.errno
+                return 0
+
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        target = ('127.0.0.1', listener.getsockname()[1])
+        try:
+            with patch('socket.socket', WindowsSocket), \
+                 patch.object(network_mod, 'warning') as mock_warning:
+                results = self.monitor.measure_many_nonblocking([target], timeout=2.0)
+        finally:
+            listener.close()
+
+        self.assertIsInstance(results[target], float)
+        mock_warning.assert_not_called()
 
     def test_latency_stats_calculation(self):
         """Test that latency statistics are calculated correctly."""
         # Set up test data
-        self.monitor._latencies['google.com'] = [0.1, 0.2, 0.3]
+        # Binary fractions, so the mean is exact
+        for latency in [0.125, 0.25, 0.375]:
+            self.monitor._record_latency('google.com', latency)
         
         # Get and verify statistics
         stats = self.monitor.get_latency_stats('google.com')
         self.assertIsNotNone(stats)
-        self.assertEqual(stats['min'], 0.1)
-        self.assertEqual(stats['max'], 0.3)
-        self.assertAlmostEqual(stats['avg'], 0.2, places=7)  # (0.1 + 0.2 + 0.3) / 3
-
-    def test_latency_storage_initialization(self):
-        """Test that the latency storage dictionary is properly initialized."""
-        # Verify the dictionary exists and is empty
+        self.assertEqual(stats['min'], 0.125)
+        self.assertEqual(stats['max'], 0.375)
+        self.assertEqual(stats['avg'], 0.25)
+
+    def test_latency_buffer_is_bounded(self):
+        """Test that only the most recent samples are kept and averaged."""
+        monitor = LatencyMonitor(max_samples=3)
+        for latency in [0.5, 0.25, 0.5, 0.75, 1.0]:
+            monitor._record_latency('google.com', latency)
+
+        self.assertEqual(list(monitor._latencies['google.com']), [0.5, 0.75, 1.0])
+        stats = monitor.get_latency_stats('google.com')
+        self.assertEqual(stats['min'], 0.5)
+        self.assertEqual(stats['max'], 1.0)
+        self.assertEqual(stats['avg'], 0.75)
+
+    def test_latency_stats_running(self):
+        """Test that running stats match a full pass over the window."""
+        import statistics
+        monitor = LatencyMonitor(max_samples=4)
+        samples = [0.3, 0.1, 0.9, 0.4, 0.2, 0.8, 0.05, 0.6] * 30
+        for i, latency in enumerate(samples, 1):
+            monitor._record_latency('google.com', latency)
+            window = samples[max(i - 4, 0):i]
+            stats = monitor.get_latency_stats('google.com')
+            self.assertEqual(stats['min'], min(window))
+            self.assertEqual(stats['max'], max(window))
+            self.assertAlmostEqual(stats['avg'], statistics.mean(window), places=9)
+            self.assertAlmostEqual(stats['stddev'], statistics.pstdev(window), places=9)
+
+    def test_latency_storage(self):
+        """Test that latency storage starts empty and keeps samples in order."""
         self.assertIsInstance(self.monitor._latencies, dict)
         self.assertEqual(len(self.monitor._latencies), 0)
-        
-        # Test adding a measurement
-        self.monitor._latencies['google.com'] = [0.1]
-        self.assertIn('google.com', self.monitor._latencies)
-        self.assertEqual(len(self.monitor._latencies['google.com']), 1)
-        self.assertEqual(self.monitor._latencies['google.com'][0], 0.1)
+
+        # Each case records one more sample on the same monitor
+        for latency, expected in [(0.1, [0.1]), (0.2, [0.1, 0.2])]:
+            with self.subTest(samples=expected):
+                self.monitor._record_latency('google.com', latency)
+                self.assertEqual(list(self.monitor._latencies), ['google.com'])
+                self.assertEqual(list(self.monitor._latencies['google.com']), expected)
+
+        # Stored in a ring buffer bounded by max_samples
+        samples = self.monitor._latencies['google.com']
+        self.assertIsInstance(samples, deque)
+        self.assertEqual(samples.maxlen, self.monitor._max_samples)
 
     def test_track_latency_check_interval(self):
         """Test that a single latency measurement is recorded correctly."""
-        with patch('time.time') as mock_time, \
-             patch.object(self.monitor, 'measure_latency', return_value=0.1), \
-             patch('diagnostics.network.network.debug'):
-            
-            # Simulate time passing during a single measurement
-            # First time call: 10.0 (current time)
-            # Second time call: 10.1 (100ms later for latency)
-            mock_time.side_effect = [10.0, 10.1]
-            
+        monitor = LatencyMonitor(clock=iter([10.0]).__next__)
+        with patch.object(monitor, 'measure_latency', return_value=0.1), \
+             patch.object(network_mod, 'debug'):
             # Record a measurement
-            self.monitor.track_latency('google.com')
-            
-            # Verify the measurement was recorded
-            self.assertIn('google.com', self.monitor._latencies)
-            self.assertEqual(len(self.monitor._latencies['google.com']), 1)
-            self.assertEqual(self.monitor._latencies['google.com'][0], 0.1)
-            
-            # Verify measure_latency was called correctly
-            self.monitor.measure_latency.assert_called_once_with('google.com', 80)
+            monitor.track_latency('google.com')
 
+            # Verify the measurement was recorded
+            self.assertIn('google.com', monitor._latencies)
+            self.assertEqual(len(monitor._latencies['google.com']), 1)
+            self.assertEqual(monitor._latencies['google.com'][0], 0.1)
 
-class TestDNSMonitor(unittest.TestCase):
+            # Verify measure_latency was called correctly
+            monitor.measure_latency.assert_called_once_with('google.com', 80)
+
+    def test_track_latency_skips_within_interval(self):
+        """Test that a second call inside the check interval does not measure."""
+        monitor = LatencyMonitor(clock=iter([10.0, 12.0, 16.0]).__next__)
+        with patch.object(monitor, 'measure_latency', return_value=0.1) as mock_measure:
+            monitor.track_latency('google.com')
+            monitor.track_latency('google.com')  # 2s later: skipped
+            monitor.track_latency('google.com')  # 6s later: measured
+        self.assertEqual(mock_measure.call_count, 2)
+
+
+class TestLatencyCommand(unittest.TestCase):
+    """Test cases for the network latency CLI command."""
+
+    def run_cli(self, *argv):
+        """Run the network CLI and return (exit code, stdout)."""
+        from contextlib import redirect_stderr, redirect_stdout
+        from io import StringIO
+        from diagnostics.network.__main__ import main
+
+        stdout = StringIO()
+        with patch('sys.argv', ['network', *argv]), \
+             redirect_stdout(stdout), redirect_stderr(StringIO()):
+            code = main()
+        return code, stdout.getvalue()
+
+    def test_partial_failures_are_skipped(self):
+        """Test that failed measurements are dropped from the results."""
+        with patch.object(LatencyMonitor, 'measure_latency',
+                          side_effect=[0.25, None, 0.5]):
+            code, output = self.run_cli('latency', 'example.com', '--count', '3', '--json')
+        self.assertEqual(code, 0)
+        data = json.loads(output)
+        self.assertEqual(sorted(data['measurements']), [0.25, 0.5])
+        self.assertEqual(data['stats']['min'], 0.25)
+
+    def test_all_failures(self):
+        """Test that the command fails when no measurement succeeds."""
+        with patch.object(LatencyMonitor, 'measure_latency', return_value=None):
+            code, output = self.run_cli('latency', 'example.com', '--count', '2')
+        self.assertEqual(code, 1)
+        self.assertEqual(output, '')
+
+
+class TestDNSMonitor(LazyMonitorMixin, unittest.TestCase):
     """Test cases for DNSMonitor class."""
 
+    monitor_class = DNSMonitor
+
     def setUp(self):
-        """Set up test fixtures."""
-        self.monitor = DNSMonitor()
+        """Patch the resolver; tests reconfigure the mock as needed."""
+        patcher = patch('socket.getaddrinfo', return_value=addrinfo('1.2.3.4'))
+        self.mock_lookup = patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_resolve_success(self):
         """Test successful DNS resolution."""
         mock_ips = ['1.2.3.4', '5.6.7.8']
-        with patch('socket.gethostbyname_ex', return_value=('google.com', [], mock_ips)):
-            ips = self.monitor.resolve('google.com')
-            self.assertEqual(ips, mock_ips)
+        self.mock_lookup.return_value = addrinfo(*mock_ips)
+        ips = self.monitor.resolve('google.com')
+        self.assertEqual(ips, mock_ips)
+
+    def test_resolve_dual_stack(self):
+        """Test that IPv4 and IPv6 addresses are returned once each, in order."""
+        self.mock_lookup.return_value = addrinfo('1.2.3.4', '2001:db8::1', '1.2.3.4')
+        ips = self.monitor.resolve('google.com')
+        self.assertEqual(ips, ['1.2.3.4', '2001:db8::1'])
+        self.assertEqual(self.mock_lookup.call_args[1]['family'], socket.AF_UNSPEC)
 
     def test_resolve_failure(self):
         """Test DNS resolution failure."""
-        with patch('socket.gethostbyname_ex', side_effect=socket.gaierror()):
-            ips = self.monitor.resolve('invalid.example.com')
-            self.assertIsNone(ips)
+        self.mock_lookup.side_effect = socket.gaierror()
+        ips = self.monitor.resolve('invalid.example.com')
+        self.assertIsNone(ips)
 
     def test_cache(self):
         """Test DNS cache functionality."""
-        mock_ips = ['1.2.3.4']
-        with patch('socket.gethostbyname_ex', return_value=('google.com', [], mock_ips)):
-            # First resolution
-            ips1 = self.monitor.resolve('google.com')
-            # Second resolution should use cache
-            ips2 = self.monitor.resolve('google.com')
-            self.assertEqual(ips1, ips2)
-            self.assertEqual(ips1, mock_ips)
+        # First resolution
+        ips1 = self.monitor.resolve('google.com')
+        # Second resolution should use cache
+        ips2 = self.monitor.resolve('google.com')
+        self.assertEqual(ips1, ips2)
+        self.assertEqual(ips1, ['1.2.3.4'])
+        self.assertEqual(self.mock_lookup.call_count, 1)
+        stats = self.monitor.get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_negative_cache(self):
+        """Test that failed lookups are cached for the negative TTL."""
+        self.mock_lookup.side_effect = socket.gaierror()
+        self.assertIsNone(self.monitor.resolve('invalid.example.com'))
+        self.assertIsNone(self.monitor.resolve('invalid.example.com'))
+        self.mock_lookup.assert_called_once()
+        stats = self.monitor.get_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_background_refresh(self):
+        """Test that entries close to expiry are served stale and refreshed."""
+        self.monitor._cache['google.com'] = (['1.2.3.4'], time.monotonic() + 1)
+        self.mock_lookup.return_value = addrinfo('5.6.7.8')
+        self.assertEqual(self.monitor.resolve('google.com'), ['1.2.3.4'])
+        self.monitor.close()
+        self.mock_lookup.assert_called_once()
+        self.assertEqual(self.mock_lookup.call_args[0][0], 'google.com')
+        self.assertEqual(self.monitor._cache['google.com'][0], ['5.6.7.8'])
+
+    def test_failed_refresh_keeps_answer(self):
+        """Test that a failed background refresh does not evict a valid answer."""
+        expiry = time.monotonic() + 1
+        self.monitor._cache['google.com'] = (['1.2.3.4'], expiry)
+        self.mock_lookup.side_effect = socket.gaierror()
+        self.assertEqual(self.monitor.resolve('google.com'), ['1.2.3.4'])
+        self.monitor.close()
+        self.mock_lookup.assert_called_once()
+        self.assertEqual(self.monitor._cache['google.com'], (['1.2.3.4'], expiry))
+
+    def test_resolve_after_close(self):
+        """Test that a near-expiry hit after close() still returns cached IPs."""
+        self.monitor.close()
+        self.monitor._cache['google.com'] = (['1.2.3.4'], time.monotonic() + 1)
+        self.assertEqual(self.monitor.resolve('google.com'), ['1.2.3.4'])
+        self.assertNotIn('google.com', self.monitor._refreshing)
+        self.mock_lookup.assert_not_called()
+
+    def test_resolve_async(self):
+        """Test resolving from a coroutine."""
+        import asyncio
+        ips = asyncio.run(self.monitor.resolve_async('google.com'))
+        self.assertEqual(ips, ['1.2.3.4'])
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used hostname is evicted first."""
+        monitor = DNSMonitor(cache_size=2)
+        monitor.resolve('a.example')
+        monitor.resolve('b.example')
+        monitor.resolve('a.example')  # hit; a is now most recently used
+        monitor.resolve('c.example')  # evicts b
+        self.assertEqual(set(monitor._cache), {'a.example', 'c.example'})
+        self.assertEqual(self.mock_lookup.call_count, 3)
+        stats = monitor.get_cache_stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['maxsize'], 2)
+
+    def test_ttl_override_and_flush(self):
+        """Test per-host TTL overrides and flushing the cache."""
+        monitor = DNSMonitor(ttl_overrides={'google.com': 0})
+        monitor.resolve('google.com')
+        monitor.resolve('google.com')
+        self.assertEqual(self.mock_lookup.call_count, 2)
+
+        self.monitor.resolve('google.com')
+        self.monitor.flush()
+        self.monitor.resolve('google.com')
+        self.assertEqual(self.mock_lookup.call_count, 4)
+
+    def test_cache_stats_entries(self):
+        """Test that live entries are counted as they expire, not rescanned."""
+        monitor = DNSMonitor(cache_size=2)
+        now = time.monotonic()
+        monitor._cache['a.example'] = (['1.2.3.4'], now + 10)
+        monitor._cache['b.example'] = (['1.2.3.4'], now - 1)
+        monitor._cache['b.example'] = (['1.2.3.4'], now + 10)  # overwrite
+        self.assertEqual(monitor.get_cache_stats()['entries'], 2)
+        monitor._cache['c.example'] = (None, now - 1)  # evicts a, expired
+        self.assertEqual(monitor.get_cache_stats()['entries'], 1)
+        self.assertEqual(monitor._cache.live_count(now + 20), 0)
+        monitor.flush()
+        self.assertEqual(monitor.get_cache_stats()['entries'], 0)
+
+
+class TestSSLCertMonitor(LazyMonitorMixin, unittest.TestCase):
+    """Test cases for SSLCertMonitor class."""
 
+    monitor_class = SSLCertMonitor
 
-class TestSSLCertMonitor(unittest.TestCase):
-    """Test cases for SSLCertMonitor class."""
+    def test_check_certificates(self):
+        """Test checking several hosts concurrently."""
+        with patch.object(self.monitor, 'check_certificate',
+                          side_effect=lambda host, port: {'host': host} if host == 'ok.example' else None):
+            results = self.monitor.check_certificates(['ok.example', 'bad.example'])
+        self.assertEqual(results, {'ok.example': {'host': 'ok.example'}, 'bad.example': None})
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.monitor = SSLCertMonitor()
+    def test_subject_and_issuer_fields(self):
+        """Test extracting names from a real X.509 name."""
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
 
-    def test_check_certificate_success(self):
-        """Test successful certificate check."""
         mock_cert = MagicMock()
-        mock_cert.subject = MagicMock()
-        mock_cert.issuer = MagicMock()
-        mock_cert.not_valid_before_utc = datetime.now()
-        mock_cert.not_valid_after_utc = datetime.now() + timedelta(days=365)
-        mock_cert.serial_number = 123456789
-        mock_version = MagicMock()
-        mock_version.name = 'v3'
-        mock_cert.version = mock_version
-
-        mock_context = MagicMock()
-        mock_socket = MagicMock()
-        mock_ssock = MagicMock()
-        mock_ssock.getpeercert.return_value = b'cert_data'
-
-        with patch('ssl.create_default_context', return_value=mock_context), \
-             patch('socket.create_connection', return_value=mock_socket), \
-             patch('cryptography.x509.load_der_x509_certificate', return_value=mock_cert):
-            
-            mock_context.wrap_socket.return_value.__enter__.return_value = mock_ssock
-            
-            cert_info = self.monitor.check_certificate('google.com')
-            self.assertIsNotNone(cert_info)
-            self.assertEqual(cert_info['serial_number'], 123456789)
-            self.assertEqual(cert_info['version'], 'v3')
-            self.assertIn('days_until_expiry', cert_info)
-            self.assertGreater(cert_info['days_until_expiry'], 0)
-            self.assertLessEqual(cert_info['days_until_expiry'], 365)
+        mock_cert.subject = x509.Name([
+            x509.NameAttribute(NameOID.COMMON_NAME, 'example.com'),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, 'Example Org'),
+        ])
+        mock_cert.issuer = x509.Name([
+            x509.NameAttribute(NameOID.COMMON_NAME, 'Example CA'),
+        ])
+        now = datetime.now(timezone.utc)
+        mock_cert.not_valid_before_utc = now
+        mock_cert.not_valid_after_utc = now + timedelta(days=30)
+
+        cert_info = self.monitor._get_cert_info(mock_cert)
+        self.assertEqual(cert_info['subject'],
+                         {'common_name': 'example.com', 'organization': 'Example Org'})
+        self.assertEqual(cert_info['issuer'],
+                         {'common_name': 'Example CA', 'organization': 'Unknown'})
+
+    def test_ssl_context_reused(self):
+        """Test that one SSL context is created and reused across checks."""
+        import ssl
+
+        with patch('ssl.create_default_context') as mock_create:
+            context = self.monitor._get_ssl_context()
+            self.assertIs(self.monitor._get_ssl_context(), context)
+            mock_create.assert_called_once()
+            self.assertFalse(context.check_hostname)
+            self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+
+    def test_ssl_context_verifying(self):
+        """Test that verification can be kept on."""
+        import ssl
+
+        context = SSLCertMonitor(verify=True)._get_ssl_context()
+        self.assertTrue(context.check_hostname)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+
+    def test_check_certificate_fast(self):
+        """Test using the fields decoded during a verified handshake."""
+        monitor = SSLCertMonitor(verify=True)
+        peercert = {
+            'subject': ((('countryName', 'US'),), (('organizationName', 'Example Org'),),
+                        (('commonName', 'example.com'),)),
+            'issuer': ((('commonName', 'Example CA'),),),
+            'version': 3,
+            'serialNumber': '075BCEF30689C8ADDF13E51AF4AFE187',
+            'notBefore': 'Jan  1 00:00:00 2024 GMT',
+            'notAfter': 'Jan  1 00:00:00 2999 GMT',
+        }
 
-    def test_check_certificate_expired(self):
-        """Test certificate check with expired certificate."""
-        mock_cert = MagicMock()
-        mock_cert.subject = MagicMock()
-        mock_cert.issuer = MagicMock()
-        mock_cert.not_valid_before_utc = datetime.now() - timedelta(days=400)
-        mock_cert.not_valid_after_utc = datetime.now() - timedelta(days=35)
-        mock_cert.serial_number = 123456789
-        mock_version = MagicMock()
-        mock_version.name = 'v3'
-        mock_cert.version = mock_version
-
-        mock_context = MagicMock()
-        mock_socket = MagicMock()
-        mock_ssock = MagicMock()
-        mock_ssock.getpeercert.return_value = b'cert_data'
-
-        with patch('ssl.create_default_context', return_value=mock_context), \
-             patch('socket.create_connection', return_value=mock_socket), \
-             patch('cryptography.x509.load_der_x509_certificate', return_value=mock_cert):
-            
-            mock_context.wrap_socket.return_value.__enter__.return_value = mock_ssock
-            
-            cert_info = self.monitor.check_certificate('google.com')
-            self.assertIsNotNone(cert_info)
-            self.assertIn('days_until_expiry', cert_info)
-            self.assertLess(cert_info['days_until_expiry'], 0)
+        with ssl_handshake_patches(peercert) as handshake:
+            cert_info = monitor.check_certificate('example.com')
+
+        handshake.ssock.getpeercert.assert_called_once_with(binary_form=False)
+        handshake.load.assert_not_called()
+        self.assertEqual(cert_info['subject'],
+                         {'common_name': 'example.com', 'organization': 'Example Org'})
+        self.assertEqual(cert_info['issuer'],
+                         {'common_name': 'Example CA', 'organization': 'Unknown'})
+        self.assertEqual(cert_info['not_before'], '2024-01-01T00:00:00+00:00')
+        self.assertEqual(cert_info['not_after'], '2999-01-01T00:00:00+00:00')
+        self.assertEqual(cert_info['serial_number'], 0x075BCEF30689C8ADDF13E51AF4AFE187)
+        self.assertEqual(cert_info['version'], 'v3')
+        self.assertGreater(cert_info['days_until_expiry'], 0)
 
     def test_check_certificate_failure(self):
         """Test certificate check failure."""
@@ -355,39 +812,88 @@ class TestSSLCertMonitor(unittest.TestCase):
             cert_info = self.monitor.check_certificate('invalid.example.com')
             self.assertIsNone(cert_info)
 
+
+class TestSSLCertificateCheck(unittest.TestCase):
+    """Test cases for SSLCertMonitor.check_certificate against a mocked handshake.
+
+    The patches are shared by the whole class; each test gets a shallow copy
+    of the certificate template with its own validity period.
+    """
+
+    CERT_TEMPLATE = SimpleNamespace(
+        subject=(),
+        issuer=(),
+        serial_number=123456789,
+        version=SimpleNamespace(name='v3'),
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        """Enter the handshake patches once for the class."""
+        cls._stack = ExitStack()
+        handshake = cls._stack.enter_context(ssl_handshake_patches())
+        cls.mock_load = handshake.load
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the shared patches."""
+        cls._stack.close()
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.monitor = SSLCertMonitor()
+        self.now = datetime.now(timezone.utc)
+        self.cert = copy.copy(self.CERT_TEMPLATE)
+        self.cert.not_valid_before_utc = self.now
+        self.cert.not_valid_after_utc = self.now + timedelta(days=365)
+        self.mock_load.reset_mock()
+        self.mock_load.return_value = self.cert
+
+    def test_check_certificate_success(self):
+        """Test successful certificate check."""
+        cert_info = self.monitor.check_certificate('google.com')
+        self.assertIsNotNone(cert_info)
+        self.assertEqual(cert_info['serial_number'], 123456789)
+        self.assertEqual(cert_info['version'], 'v3')
+        self.assertIn('days_until_expiry', cert_info)
+        self.assertGreater(cert_info['days_until_expiry'], 0)
+        self.assertLessEqual(cert_info['days_until_expiry'], 365)
+
+    def test_check_certificate_expired(self):
+        """Test certificate check with expired certificate."""
+        self.cert.not_valid_before_utc = self.now - timedelta(days=400)
+        self.cert.not_valid_after_utc = self.now - timedelta(days=35)
+        cert_info = self.monitor.check_certificate('google.com')
+        self.assertIsNotNone(cert_info)
+        self.assertIn('days_until_expiry', cert_info)
+        self.assertLess(cert_info['days_until_expiry'], 0)
+
     def test_cache(self):
         """Test certificate cache functionality."""
-        mock_cert = MagicMock()
-        mock_cert.subject = MagicMock()
-        mock_cert.issuer = MagicMock()
-        mock_cert.not_valid_before_utc = datetime.now()
-        mock_cert.not_valid_after_utc = datetime.now() + timedelta(days=365)
-        mock_cert.serial_number = 123456789
-        mock_version = MagicMock()
-        mock_version.name = 'v3'
-        mock_cert.version = mock_version
-
-        mock_context = MagicMock()
-        mock_socket = MagicMock()
-        mock_ssock = MagicMock()
-        mock_ssock.getpeercert.return_value = b'cert_data'
-
-        with patch('ssl.create_default_context', return_value=mock_context), \
-             patch('socket.create_connection', return_value=mock_socket), \
-             patch('cryptography.x509.load_der_x509_certificate', return_value=mock_cert):
-            
-            mock_context.wrap_socket.return_value.__enter__.return_value = mock_ssock
-            
-            # First check
-            cert_info1 = self.monitor.check_certificate('google.com')
-            # Second check should use cache
-            cert_info2 = self.monitor.check_certificate('google.com')
-            self.assertEqual(cert_info1, cert_info2)
-            self.assertEqual(cert_info1['serial_number'], 123456789)
-            self.assertEqual(cert_info1['version'], 'v3')
-            self.assertIn('days_until_expiry', cert_info1)
-            self.assertGreater(cert_info1['days_until_expiry'], 0)
-            self.assertLessEqual(cert_info1['days_until_expiry'], 365)
+        # First check
+        cert_info1 = self.monitor.check_certificate('google.com')
+        # Second check should use cache without re-parsing the certificate
+        cert_info2 = self.monitor.check_certificate('google.com')
+        self.assertEqual(cert_info1, cert_info2)
+        self.mock_load.assert_called_once()
+        self.assertEqual(cert_info1['serial_number'], 123456789)
+        self.assertEqual(cert_info1['version'], 'v3')
+        self.assertIn('days_until_expiry', cert_info1)
+        self.assertGreater(cert_info1['days_until_expiry'], 0)
+        self.assertLessEqual(cert_info1['days_until_expiry'], 365)
+
+    def test_cached_info_is_not_shared(self):
+        """Test that mutating a returned result does not alter the cache."""
+        cert_info = self.monitor.check_certificate('google.com')
+        cert_info['serial_number'] = 0
+        cert_info['subject']['common_name'] = 'changed'
+        cached = self.monitor.check_certificate('google.com')
+        cached['issuer']['organization'] = 'changed'
+        cached = self.monitor.check_certificate('google.com')
+        self.mock_load.assert_called_once()
+        self.assertEqual(cached['serial_number'], 123456789)
+        self.assertEqual(cached['subject']['common_name'], 'Unknown')
+        self.assertEqual(cached['issuer']['organization'], 'Unknown')
 
 
 if __name__ == '__main__':